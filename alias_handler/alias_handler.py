@@ -1,3 +1,4 @@
+import dataclasses
 import git
 import os
 from console import console
@@ -7,6 +8,7 @@ import re
 from io_module import api_manager
 from dotenv import load_dotenv
 from community import community
+from community.commit import Commit
 from progress.bar import Bar
 
 
@@ -25,7 +27,18 @@ def alias_extraction(community: community.Community):
     # we get two data structure, one containing a mapping of emails of community members for which login username is available,
     # the other one containing a list of users with no public login available
     commits_login, commits_without_login = get_commits_information(community)
+    return compute_aliases(commits_login, commits_without_login)
 
+
+def compute_aliases(commits_login: dict, commits_without_login: list):
+    """
+    This function groups the emails of the commit authors by GitHub login, and maps each email
+    with no login available to the most similar login or email.
+
+    :param commits_login: the mapping from author emails to their login
+    :param commits_without_login: the author emails with no login available
+    :return: the mapping from each alias to its emails
+    """
     aliases = {}
     used = {}
 
@@ -86,73 +99,119 @@ def alias_extraction(community: community.Community):
 
 
 def get_commits_information(community: community.Community):
-    commits = community.data.commits
-
-    # get all distinct author emails from the commit list of the community
-    emails = set(extract_author_id(commit.author) for commit in commits)
-
-    # for each email, get the SHA of one single commit from the author
-    commits_sha = {}
-    for email in emails:
-        commit = next(
-            commit
-            for commit in community.data.commits
-            if extract_author_id(commit.author) == email
-        )
-
-        commits_sha[email] = commit.hexsha
+    commits_sha = get_commits_sha(community.data.commits)
 
     # using the GitHub API, we try to retrieve the LOGIN of the author by querying the commit informations
     commits_login = dict()
     commits_without_login = []
-    with Bar("Computing aliases...", max=len(commits_sha)) as bar:
-        for email in commits_sha:
-            sha = commits_sha[email]
-            commit = api_manager.get_commit_by_sha(
-                community.repo_owner, community.repo_name, sha
+    emails = list(commits_sha.keys())
+    with Bar("Computing aliases...", max=len(emails)) as bar:
+        for i in range(0, len(emails), api_manager.GRAPHQL_BATCH_SIZE):
+            batch = emails[i : i + api_manager.GRAPHQL_BATCH_SIZE]
+            authors = api_manager.get_commits_authors(
+                community.repo_owner,
+                community.repo_name,
+                [commits_sha[email] for email in batch],
             )
-            if commit is None or not "author" in commit.keys():
-                continue
-
-            if (
-                not commit["author"] is None
-                and "login" in commit["author"].keys()
-                and not commit["author"]["login"] is None
-            ):
-                commits_login[email] = commit["author"]["login"]
-            else:
-                commits_without_login.append(email)
-            bar.next()
+            split_by_login(
+                batch, commits_sha, authors, commits_login, commits_without_login
+            )
+            bar.next(len(batch))
 
     return commits_login, commits_without_login
 
 
-def replace_all_aliases(commits: list[git.Commit], aliases):
+def get_commits_sha(commits: list):
+    """
+    This function gets, for each distinct author email, the SHA of one single commit from the author.
+
+    :param commits: the commits of the community
+    :return: the mapping from author emails to a commit SHA
+    """
+    commits_sha = {}
+    for commit in commits:
+        commits_sha.setdefault(commit.author, commit.hexsha)
+    return commits_sha
+
+
+def split_by_login(
+    emails: list,
+    commits_sha: dict,
+    authors: dict,
+    commits_login: dict,
+    commits_without_login: list,
+):
     """
-    This function reads computed aliases from a file and replaces author aliases with unique one
+    This function sorts author emails by whether GitHub associates their commits with a login.
+    Emails whose commit is unknown to GitHub are skipped.
+
+    :param emails: the author emails
+    :param commits_sha: the mapping from author emails to a commit SHA
+    :param authors: the mapping from commit SHAs to the login of their author, as returned by the API
+    :param commits_login: the mapping from emails to logins, updated in place
+    :param commits_without_login: the emails with no login available, updated in place
+    """
+    for email in emails:
+        sha = commits_sha[email]
+        if sha not in authors:
+            continue
+
+        if authors[sha] is not None:
+            commits_login[email] = authors[sha]
+        else:
+            commits_without_login.append(email)
+
+
+def replace_all_aliases(commits: list[Commit], aliases):
+    """
+    This function replaces the authors and committers of the commits that are aliases with the
+    unique one. The commits are not modified, updated copies are returned.
 
     :param commits: the list of commits from wich authors are taken
+    :param aliases: the mapping from each alias to its emails
+    :return: the updated commits
     """
 
+    transposed = transpose_aliases(aliases)
+
+    updated_commits = []
+    for commit in commits:
+        author, committer = replace_aliases(commit.author, commit.committer, transposed)
+        if author != commit.author or committer != commit.committer:
+            commit = dataclasses.replace(commit, author=author, committer=committer)
+
+        updated_commits.append(commit)
+
+    return updated_commits
+
+
+def transpose_aliases(aliases: dict):
+    """
+    :param aliases: the mapping from each alias to its emails
+    :return: the mapping from each email to its alias
+    """
     transposed = {}
     for alias in aliases:
         for email in aliases[alias]:
             transposed[email] = alias
+    return transposed
 
-    updated_commits = []
-    for commit in commits:
-        copy = commit
-        author = extract_author_id(commit.author)
-        committer = extract_author_id(commit.committer)
-        if author in transposed:
-            copy.author.email = transposed[author]
-
-        if committer in transposed and author in transposed.keys():
-            copy.committer.email = transposed[author]
 
-        updated_commits.append(copy)
+def replace_aliases(author: str, committer: str, transposed: dict):
+    """
+    This function replaces the author of a commit with its alias; the committer is replaced
+    with the alias of the author, if both have an alias.
 
-    return updated_commits
+    :param author: the id of the author
+    :param committer: the id of the committer
+    :param transposed: the mapping from each email to its alias
+    :return: the author and the committer
+    """
+    if author in transposed:
+        if committer in transposed:
+            committer = transposed[author]
+        author = transposed[author]
+    return author, committer
 
 
 def extract_author_id(author: git.Actor):
@@ -0,0 +1,98 @@
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import git
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from io_module import repository_manager
+
+"""
+Benchmark of the retrieval of the files modified by the commits of a history: one git diff per
+commit (Commit.stats) against the single git log pass of the activity index
+(iter_commit_activity).
+A synthetic repository is generated with git fast-import.
+
+Usage: python benchmarks/modified_files_benchmark.py [--commits 5000] [--files 2000]
+"""
+
+
+def generate_repository(path: str, commits: int, files: int, seed: int = 42):
+    """
+    This function generates a repository where each commit modifies a few files,
+    with a merge every 50 commits.
+
+    :param path: the directory of the repository
+    :param commits: the number of commits
+    :param files: the number of distinct files
+    :param seed: the seed of the random generator
+    """
+    rng = random.Random(seed)
+    git.Repo.init(path)
+    stream = []
+    timestamp = 1672531200
+    for mark in range(1, commits + 1):
+        timestamp += 600
+        branch = "refs/heads/side" if mark % 50 == 49 else "refs/heads/master"
+        stream.append("commit {}\nmark :{}\n".format(branch, mark))
+        author = "dev{0} <dev{0}@example.com> {1} +0000\n".format(mark % 20, timestamp)
+        stream.append("author " + author + "committer " + author)
+        stream.append("data <<EOF\ncommit {}\nEOF\n".format(mark))
+        if mark > 1:
+            parent = mark - 2 if mark % 50 == 0 else mark - 1
+            stream.append("from :{}\n".format(parent))
+        if mark % 50 == 0:
+            stream.append("merge :{}\n".format(mark - 1))
+        for _ in range(rng.randint(1, 5)):
+            name = "src/module{}/file{}.py".format(
+                rng.randrange(50), rng.randrange(files)
+            )
+            content = "# revision {}\n".format(rng.random())
+            stream.append(
+                "M 644 inline {}\ndata {}\n{}\n".format(name, len(content), content)
+            )
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        cwd=path,
+        input="".join(stream).encode(),
+        check=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=5000)
+    parser.add_argument("--files", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        generate_repository(path, args.commits, args.files)
+        repo = git.Repo(path, odbt=git.GitCmdObjectDB)
+        commits = list(repo.iter_commits("master"))
+        print("Commits: {}".format(len(commits)))
+
+        start = time.perf_counter()
+        per_commit = {
+            commit.hexsha: list(commit.stats.files.keys()) for commit in commits
+        }
+        per_commit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single_pass = {
+            record.hexsha: files
+            for record, files in repository_manager.iter_commit_activity(repo)
+        }
+        single_pass_time = time.perf_counter() - start
+
+    assert single_pass == per_commit
+    print("One git diff per commit: {:.2f}s".format(per_commit_time))
+    print("Single git log pass:     {:.2f}s".format(single_pass_time))
+    print("Speedup: {:.1f}x".format(per_commit_time / single_pass_time))
+
+
+if __name__ == "__main__":
+    main()
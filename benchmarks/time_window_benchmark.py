@@ -0,0 +1,70 @@
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from community.commit import Commit
+from community.community import Community
+from community.data import Data
+from data_retriever import filters
+from utils import check_date_within_timewindow
+
+"""
+Benchmark of the selection of the commits within a time window: the date checks on the strings
+built by convert_date against the epoch bounds of time_window, on synthetic commits spread over
+ten years.
+
+Usage: python benchmarks/time_window_benchmark.py [--commits 1000000]
+"""
+
+
+def generate_commits(count: int, seed: int = 42):
+    random.seed(seed)
+    commits = []
+    for i in range(count):
+        authored_date = random.randint(1388534400, 1704067200)
+        committed_date = authored_date + random.choice((0, 0, 0, 3600, 86400 * 3))
+        commits.append(
+            Commit("{:040x}".format(i), "a", "a", authored_date, committed_date)
+        )
+    return commits
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=1000000)
+    args = parser.parse_args()
+
+    commits = generate_commits(args.commits)
+    community = Community("owner", "repo")
+    data = Data()
+    data.start_date = datetime.datetime(2023, 1, 1)
+    data.end_date = datetime.datetime(2023, 3, 31)
+    data.all_commits = commits
+    community.add_data(data)
+
+    start = time.perf_counter()
+    by_date = [
+        commit
+        for commit in commits
+        if check_date_within_timewindow(community, commit.committed_date)
+        or check_date_within_timewindow(community, commit.authored_date)
+    ]
+    by_date_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    filters.filter_commits(community)
+    by_epoch_time = time.perf_counter() - start
+
+    assert community.data.commits == by_date
+    print("Commits in the window: {}".format(len(by_date)))
+    print("Date checks:  {:.2f}s".format(by_date_time))
+    print("Epoch bounds: {:.2f}s".format(by_epoch_time))
+    print("Speedup: {:.1f}x".format(by_date_time / by_epoch_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import git
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.modified_files_benchmark import generate_repository
+from io_module import repository_manager
+
+"""
+Benchmark of the reading of the commits of an analysis: iterating the commits with GitPython and
+reading their authors, committers and dates from its objects, against the single git log pass
+of repository_manager.iter_window_commits that the analysis uses.
+A synthetic repository is generated with git fast-import.
+
+Usage: python benchmarks/window_commits_benchmark.py [--commits 5000] [--files 2000]
+"""
+
+
+def measure(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def read_actors(repo: git.Repo):
+    return [
+        (
+            commit.hexsha,
+            commit.author.email.lower().strip(),
+            commit.committer.email.lower().strip(),
+            commit.authored_date,
+            commit.committed_date,
+        )
+        for commit in repo.iter_commits()
+    ]
+
+
+def read_records(repo: git.Repo):
+    return [
+        (
+            record.hexsha,
+            record.author,
+            record.committer,
+            record.authored_date,
+            record.committed_date,
+        )
+        for record in repository_manager.iter_window_commits(
+            repo, datetime(1970, 1, 2)
+        )
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=5000)
+    parser.add_argument("--files", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        generate_repository(path, args.commits, args.files)
+        repo = git.Repo(path, odbt=git.GitCmdObjectDB)
+        actors, actors_time = measure(lambda: read_actors(repo))
+        records, records_time = measure(lambda: read_records(repo))
+        repo.close()
+
+    assert records == actors
+    print("Commits: {}".format(len(records)))
+    print("GitPython objects: {:.2f}s".format(actors_time))
+    print("Single git log pass: {:.2f}s".format(records_time))
+    print("Speedup: {:.1f}x".format(actors_time / records_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+@dataclass(slots=True)
+class Commit:
+    """
+    This class stores the data of a commit needed to compute the metrics, read once from the
+    repository so that accessing it never runs git.
+    Authors and committers are identified as in alias_handler.extract_author_id, dates are
+    epochs and time zone offsets are seconds west of UTC, as in GitPython.
+    """
+
+    hexsha: str
+    author: str
+    committer: str
+    authored_date: int
+    committed_date: int
+    author_tz_offset: int = 0
+    committer_tz_offset: int = 0
+
+
+@lru_cache(maxsize=None)
+def parse_tz_offset(offset: str):
+    """
+    :param offset: a git time zone offset, e.g. +0200
+    :return: the offset in seconds west of UTC, e.g. -7200 (shared by the commits with the same
+    offset, as they are few)
+    """
+    seconds = int(offset[1:3]) * 3600 + int(offset[3:5]) * 60
+    return -seconds if offset[0] == "+" else seconds
+
+
+def actor_id(email: str):
+    # ids are shared by all the commits of an actor instead of being copied for each of them
+    return sys.intern(email.lower().strip())
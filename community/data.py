@@ -22,10 +22,19 @@ class Data:
     map_user_followers: {} = None
     map_user_following: {} = None
     map_user_repositories: {} = None
+    # commits (as commit.Commit records) from which the ones within the time window are
+    # filtered, possibly streamed
     all_commits: list = None
+    total_commits: int = None
+    # for each committer, the epochs of the first and last commit of the whole history
+    committers_activity: {} = None
     commits: list = None
     commits_comments: list = None
-    modified_files_per_commit: {} = None
+    # (author, committer, authored day, committed day, commits) of the commits within the time
+    # window, with aliases, from io_module.activity_index
+    commits_per_day: list = None
+    # (file, author, committed day, touches) of the commits committed within the time window
+    file_touches: list = None
     milestones: list = None
     coordinates: list = None
     distances: list = None
@@ -0,0 +1,15 @@
+import pytest
+from io_module import api_manager
+
+
+@pytest.fixture
+def fresh_session(monkeypatch, tmp_path):
+    """
+    The test gets its own session, token pool and cache, and no cassette.
+    Modules extend it by overriding it with a fixture of the same name requesting it.
+    """
+    monkeypatch.setattr(api_manager, "_session", None)
+    monkeypatch.setattr(api_manager, "_token_pool", None)
+    monkeypatch.setattr(api_manager, "_http_cache", None)
+    monkeypatch.setattr(api_manager, "_cassette", None)
+    monkeypatch.setattr(api_manager, "HTTP_CACHE_PATH", str(tmp_path / "cache.sqlite"))
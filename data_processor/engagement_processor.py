@@ -2,7 +2,8 @@ from community import community
 import statistics
 from console import console
 import datetime
-from utils import convert_date
+import time
+from time_window import DAY, TimeWindow
 
 
 def compute_engagement_data(community: community.Community):
@@ -129,30 +130,22 @@ def median_contains_list(users: list, members_logins: list):
 
 
 def median_monthly_commit_distribution(community: community.Community):
-    commits = community.data.commits
-    commit_dates_per_member = {}
+    commits_per_month_per_member = {}
     for member in community.data.members_logins:
-        commit_dates_per_member[member] = []
-    for commit in commits:
-        if commit.author.email in commit_dates_per_member.keys():
-            commit_dates_per_member[commit.author.email].append(
-                datetime.datetime.strptime(
-                    convert_date(commit.committed_date), "%Y-%m-%d"
-                )
-            )
+        commits_per_month_per_member[member] = {}
+    for author, _, _, committed_day, commits in community.data.commits_per_day:
+        if author in commits_per_month_per_member.keys():
+            commits_per_month = commits_per_month_per_member[author]
+            month = time.gmtime(committed_day * DAY).tm_mon
+            commits_per_month[month] = commits_per_month.get(month, 0) + commits
     m_commitpermonth_permember = []
 
     for member in community.data.members_logins:
-        commits_per_month = {}
-        if len(commit_dates_per_member[member]) > 0:
-            for date in commit_dates_per_member[member]:
-                if date.month in commits_per_month.keys():
-                    commits_per_month[date.month] = commits_per_month[date.month] + 1
-                else:
-                    commits_per_month[date.month] = 0
-
+        commits_per_month = commits_per_month_per_member[member]
+        if len(commits_per_month) > 0:
+            # the first commit of each month is not counted
             m_commitpermonth_permember.append(
-                statistics.mean(commits_per_month.values())
+                statistics.mean(count - 1 for count in commits_per_month.values())
             )
     m_commitpermonth_permember = sorted(m_commitpermonth_permember)
     if len(m_commitpermonth_permember) > 0:
@@ -170,7 +163,7 @@ def median_monthly_filecollab_distribution(community: community.Community):
             if f not in count_committer_perfile_permonth.keys():
                 count_committer_perfile_permonth[f] = {}
                 count_committer_perfile_permonth[f][i] = 0
-            count_committer_perfile_permonth[f][i] = len(monthly_committers_per_file[f])
+            count_committer_perfile_permonth[f][i] = monthly_committers_per_file[f]
     mean_committer_perfile_permonth = []
     for f in count_committer_perfile_permonth:
         mean_committer_perfile_permonth.append(
@@ -184,45 +177,21 @@ def median_monthly_filecollab_distribution(community: community.Community):
 
 
 def extract_committer_per_file(community: community.Community):
+    """
+    :return: for each file, the number of commits touching it within the time window, and the
+    same for each month of the time window
+    """
+    window = TimeWindow.of(community)
     files_changed = {}
     monthly_files_changed = {}
     monthly_files_changed[0] = {}
     monthly_files_changed[1] = {}
     monthly_files_changed[2] = {}
-    for commit in community.data.modified_files_per_commit:
-        for f in community.data.modified_files_per_commit[commit]:
-            date = None
-            for lc in community.data.commits:
-                if lc.hexsha == commit:
-                    if f in files_changed.keys():
-                        files_changed[f].append(lc.author.email)
-                    else:
-                        files_changed[f] = [lc.author.email]
-                    date = datetime.datetime.strptime(
-                        convert_date(lc.committed_date), "%Y-%m-%d"
-                    )
-                    if date is not None:
-                        month = check_month(community, date)
-                        if month is not None and month in monthly_files_changed.keys():
-                            if f in monthly_files_changed[month].keys():
-                                monthly_files_changed[month][f].append(lc.author.email)
-                            else:
-                                monthly_files_changed[month][f] = [lc.author.email]
+    for f, _, committed_day, touches in community.data.file_touches:
+        files_changed[f] = files_changed.get(f, 0) + touches
+        month = window.month(committed_day * DAY)
+        if month is not None:
+            monthly_files_changed[month][f] = (
+                monthly_files_changed[month].get(f, 0) + touches
+            )
     return files_changed, monthly_files_changed
-
-
-def check_month(community: community.Community, date):
-    if (
-        community.data.end_date
-        > date
-        > (community.data.start_date + datetime.timedelta(days=60))
-    ):
-        return 2
-    elif (
-        community.data.end_date
-        > date
-        > (community.data.start_date + datetime.timedelta(days=30))
-    ):
-        return 1
-    elif community.data.end_date > date > community.data.start_date:
-        return 0
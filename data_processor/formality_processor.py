@@ -16,8 +16,8 @@ def mean_membership_type(community: community.Community):
     authors = []
     committers = []
     for commit in community.data.commits:
-        authors.append(commit.author.email)
-        committers.append(commit.committer.email)
+        authors.append(commit.author)
+        committers.append(commit.committer)
 
     for pr in community.data.merged_pull_requests:
         if (
@@ -46,11 +46,8 @@ def mean_membership_type(community: community.Community):
 
 
 def lifetime_in_days(community: community.Community):
-    (
-        first_commit_datetime,
-        first_commit_hash,
-        last_commit_datetime,
-        last_commit_hash,
-    ) = filters.filter_first_last_commits(community.data.all_commits)
+    first_commit_datetime, last_commit_datetime = filters.filter_first_last_dates(
+        community.data.committers_activity
+    )
     delta = first_commit_datetime - last_commit_datetime
     return delta.days
@@ -1,6 +1,6 @@
 from community import community
-from utils import convert_date
-from datetime import datetime
+from alias_handler import alias_handler
+from time_window import day
 from console import console
 
 
@@ -12,34 +12,22 @@ def compute_longevity_data(community: community.Community):
 
 
 def mean_committer_longevity(community: community.Community):
-    commits = community.data.all_commits
-    commit_date_per_committer = {}
-    """ 
-    We use committer date instead of author date, since that's when the commit was last applied: 
+    """
+    We use committer date instead of author date, since that's when the commit was last applied:
     https://stackoverflow.com/questions/18750808/difference-between-author-and-committer-in-git
+    The first and last commits of each member are taken from the whole history, merging the
+    committer emails that are aliases of the same member.
     """
-    for c in commits:
-        if (
-            c.committer.email is not None
-            and c.committer.email in community.data.members_logins
-        ):
-            if c.committer.email in commit_date_per_committer.keys():
-                commit_date_per_committer[c.committer.email].append(
-                    datetime.strptime(convert_date(c.committed_date), "%Y-%m-%d")
-                )
-            else:
-                commit_date_per_committer[c.committer.email] = [
-                    datetime.strptime(convert_date(c.committed_date), "%Y-%m-%d")
-                ]
+    transposed = alias_handler.transpose_aliases(community.data.aliases)
+    members = set(community.data.members_logins)
+    commit_dates_per_committer = {}
+    for committer, (first, last) in community.data.committers_activity.items():
+        member = transposed.get(committer, committer)
+        if member in members:
+            dates = commit_dates_per_committer.setdefault(member, [first, last])
+            dates[0] = min(dates[0], first)
+            dates[1] = max(dates[1], last)
     total_longevity_indays = 0
-    for committer in commit_date_per_committer:
-        last_commit_datetime = datetime.strptime("1980-01-01", "%Y-%m-%d")
-        first_commit_datetime = datetime.today()
-        for date in commit_date_per_committer[committer]:
-            if date > last_commit_datetime:
-                last_commit_datetime = date
-            if date < first_commit_datetime:
-                first_commit_datetime = date
-        delta = first_commit_datetime - last_commit_datetime
-        total_longevity_indays += abs(delta.days)
-    return total_longevity_indays / len(commit_date_per_committer)
+    for first, last in commit_dates_per_committer.values():
+        total_longevity_indays += abs(day(first) - day(last))
+    return total_longevity_indays / len(commit_dates_per_committer)
@@ -0,0 +1,252 @@
+import asyncio
+from console import console
+from community import community
+from data_retriever import filters
+from data_retriever.data_retriever import (
+    MEMBERS_PER_QUERY,
+    complete_follows,
+    connection_fields,
+    extract_member_data,
+    follows_to_check,
+    map_prs_to_comments,
+    merged_pull_requests,
+    retrieve_activity,
+    retrieve_active_users,
+    sort_pull_requests,
+    split_by_fanout,
+)
+from io_module import api_manager
+from io_module.async_api_manager import AsyncGitHubClient
+from progress.bar import Bar
+
+"""
+This module contains asyncio versions of the entry points of data_retriever, fanning out
+the per-member, per-pull request and per-batch requests to the GitHub APIs.
+They store the same data in the community as their synchronous counterparts.
+"""
+
+
+async def retrieve_structure_data(community: community.Community):
+    """
+    Retrieves all GitHub data that is needed to compute the structure metrics, requesting the
+    followers, following and repositories of all members and the details of all merged pull
+    requests concurrently.
+
+    :param community: The community for which we need to retrieve GitHub Data
+    """
+    async with AsyncGitHubClient() as client:
+        members = community.data.members
+        logins = [member["login"] for member in members]
+        restricted_followers, restricted_following = split_by_fanout(members)
+        chunks = [
+            members[i : i + MEMBERS_PER_QUERY]
+            for i in range(0, len(members), MEMBERS_PER_QUERY)
+        ]
+        with Bar("Filtering members data", max=len(members)) as bar:
+            chunks_data = await gather_with_progress(
+                bar,
+                [
+                    retrieve_data_per_members(
+                        client, chunk, restricted_followers, restricted_following
+                    )
+                    for chunk in chunks
+                ],
+                [len(chunk) for chunk in chunks],
+            )
+        members_data = {}
+        for chunk_data in chunks_data:
+            members_data.update(chunk_data)
+        map_user_followers = {}
+        map_user_following = {}
+        map_user_repositories = {}
+        for member in members:
+            followers_login, following_login, repo_names = members_data[member["login"]]
+            map_user_followers[member["login"]] = followers_login
+            map_user_following[member["login"]] = following_login
+            map_user_repositories[member["login"]] = repo_names
+        pairs = follows_to_check(logins, restricted_followers, restricted_following)
+        with Bar("Checking follows between members", max=len(pairs)) as bar:
+            results = await gather_with_progress(
+                bar, [client.is_following(*pair) for pair in pairs]
+            )
+        complete_follows(
+            logins,
+            map_user_followers,
+            map_user_following,
+            restricted_followers,
+            restricted_following,
+            dict(zip(pairs, results)),
+        )
+        community.data.map_user_followers = map_user_followers
+        community.data.map_user_following = map_user_following
+        community.data.map_user_repositories = map_user_repositories
+
+        console.log("Retrieving pull requests and comments")
+        prs, comments = await asyncio.gather(
+            client.get_pull_requests(
+                community.repo_owner,
+                community.repo_name,
+                community.data.start_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            ),
+            client.get_prs_comments(
+                community.repo_owner,
+                community.repo_name,
+                community.data.start_date.isoformat(),
+            ),
+        )
+        filtered_prs = sort_pull_requests(filters.filter_prs(community, prs))
+        community.data.all_pull_requests = filtered_prs
+        # for each pull request that has been merged, retrieve who merged it
+        numbers = [pr["number"] for pr in filtered_prs if pr["merged_at"] is not None]
+        batches = [
+            numbers[i : i + api_manager.GRAPHQL_BATCH_SIZE]
+            for i in range(0, len(numbers), api_manager.GRAPHQL_BATCH_SIZE)
+        ]
+        with Bar("Retrieving details for pull requests", max=len(numbers)) as bar:
+            batches_merged_by = await gather_with_progress(
+                bar,
+                [
+                    client.get_prs_merged_by(
+                        community.repo_owner, community.repo_name, batch
+                    )
+                    for batch in batches
+                ],
+                [len(batch) for batch in batches],
+            )
+        merged_by = {}
+        for batch_merged_by in batches_merged_by:
+            merged_by.update(batch_merged_by)
+        community.data.merged_pull_requests = merged_pull_requests(numbers, merged_by)
+
+    console.log("Mapping comments to pull requests")
+    community.data.pr_comments = filters.filter_comments(community, comments)
+    map_prs_to_comments(community)
+
+
+async def retrieve_data_per_members(
+    client: AsyncGitHubClient,
+    members: list,
+    restricted_followers: set,
+    restricted_following: set,
+):
+    """
+    Given some community members we retrieve their followers, following and repositories through
+    GraphQL, falling back to the REST API for the members GraphQL cannot resolve.
+    """
+    connections = await client.get_users_connections(
+        {
+            member["login"]: connection_fields(
+                member["login"], restricted_followers, restricted_following
+            )
+            for member in members
+        }
+    )
+    missing = [member for member in members if member["login"] not in connections]
+    fallback = await asyncio.gather(
+        *[
+            retrieve_data_per_member(
+                client,
+                member,
+                member["login"] not in restricted_followers,
+                member["login"] not in restricted_following,
+            )
+            for member in missing
+        ]
+    )
+    members_data = {
+        member["login"]: member_data for member, member_data in zip(missing, fallback)
+    }
+    for login, connection in connections.items():
+        members_data[login] = (
+            connection.get("followers", []),
+            connection.get("following", []),
+            connection["repositories"],
+        )
+    return members_data
+
+
+async def retrieve_data_per_member(
+    client: AsyncGitHubClient,
+    member,
+    with_followers: bool = True,
+    with_following: bool = True,
+):
+    """
+    Given a community member we retrieve his/her followers, following and repositories concurrently.
+    If they cannot be retrieved, the member is considered without followers, following and repositories.
+    The followers or the following list are left empty when not requested, see split_by_fanout.
+    """
+    if (
+        member["followers_url"] is None
+        or member["following_url"] is None
+        or member["repos_url"] is None
+    ):
+        return [], [], []
+
+    async def skipped():
+        return []
+
+    try:
+        followers, following, repos = await asyncio.gather(
+            client.make_request(member["followers_url"])
+            if with_followers
+            else skipped(),
+            client.make_request(str(member["following_url"]).split("{")[0])
+            if with_following
+            else skipped(),
+            client.make_request(member["repos_url"]),
+        )
+    except api_manager.GitHubAPIError as e:
+        console.print(
+            "[bold red]Could not retrieve the data of {}: {}".format(member["login"], e)
+        )
+        return [], [], []
+    return extract_member_data(followers, following, repos)
+
+
+async def retrieve_miscellaneous_data(community: community.Community):
+    """
+    Retrieves the data needed by the remaining metrics, reading the activity index while the
+    commit comments, watchers and stargazers are requested.
+
+    :param community: the analyzed community
+    """
+    async with AsyncGitHubClient() as client:
+        loop = asyncio.get_running_loop()
+        _, comments, watchers, stargazers = await asyncio.gather(
+            loop.run_in_executor(None, retrieve_activity, community),
+            client.get_commits_comments(
+                community.repo_owner,
+                community.repo_name,
+                community.data.start_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            ),
+            client.get_watchers(community.repo_owner, community.repo_name),
+            client.get_stargazers(community.repo_owner, community.repo_name),
+        )
+    community.data.commits_comments = filters.filter_comments(community, comments)[::-1]
+    console.log("Retrieving active users")
+    retrieve_active_users(community)
+    community.data.watchers = [{"login": user["login"]} for user in watchers]
+    community.data.stargazers = [{"login": user["login"]} for user in stargazers]
+
+
+async def gather_with_progress(bar: Bar, coroutines: list, steps: list = None):
+    """
+    This function runs coroutines concurrently, advancing the progress bar as each one completes.
+
+    :param bar: the progress bar
+    :param coroutines: the coroutines to run
+    :param steps: how much each coroutine advances the bar (1 if not given)
+    :return: the results of the coroutines, in the same order
+    """
+
+    async def advance(coroutine, step):
+        result = await coroutine
+        bar.next(step)
+        return result
+
+    if steps is None:
+        steps = [1] * len(coroutines)
+    return await asyncio.gather(
+        *[advance(coroutine, step) for coroutine, step in zip(coroutines, steps)]
+    )
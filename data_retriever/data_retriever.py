@@ -1,14 +1,17 @@
 from console import console
-import time
-from datetime import datetime, date, timedelta
-import git
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from community import community
-from io_module import api_manager
+from io_module import api_manager, repository_manager
 from data_retriever import filters
 from alias_handler import alias_handler
 from data_retriever import geographical_retriever
 from progress.bar import Bar
-from utils import check_githubdate_within_timewindow, convert_date
+from time_window import DAY, TimeWindow
+
+# number of requests retrieving the followers, following and repositories of members concurrently
+MEMBER_WORKERS = 8
+# number of members whose followers, following and repositories are requested by the same queries
+MEMBERS_PER_QUERY = 10
 
 
 def retrieve_data_and_check_validity(community: community.Community):
@@ -19,13 +22,16 @@ def retrieve_data_and_check_validity(community: community.Community):
     it has at least 10 members active in the last 90 days,
     it has at least 1 milestone (all time),
     it has enough location data to compute dispersion.
+    Checks run from the cheapest to the most expensive one, and the validation stops at the first
+    failing check: local commits, an upper bound of the members from the commit authors, a single
+    milestone, the members, and the locations of the members before geocoding them.
 
     :param community: the community to be checked
     :return: true if valid, false otherwise
     """
     console.log("Checking commits")
     filters.filter_commits(community)
-    console.print("Total number of commits: " + str(len(community.data.all_commits)))
+    console.print("Total number of commits: " + str(community.data.total_commits))
     console.print(
         "Valid commits between "
         + str(community.data.start_date)
@@ -37,18 +43,31 @@ def retrieve_data_and_check_validity(community: community.Community):
     if len(community.data.commits) < 100:
         console.print("[bold red]There must be at least 100 commits")
         return False
+    # each member authored commits with at least one distinct email
+    if len(alias_handler.get_commits_sha(community.data.commits)) < 2:
+        console.print("[bold red]There must be at least 2 members")
+        return False
+    console.log("Checking number of milestones")
+    if not api_manager.has_milestones(community.repo_owner, community.repo_name):
+        console.print("[bold red]There must be at least 1 milestone")
+        return False
+
     retrieve_member_data(community)
 
     if len(community.data.members) < 2:
         console.print("[bold red]There must be at least 2 members")
         return False
-    console.log("Checking number of milestones")
+    # the milestones were checked above, they are downloaded in full for the metrics
     milestones = api_manager.get_milestones(community.repo_owner, community.repo_name)
     # milestones = filters.filter_milestones(community, milestones)
-    if len(milestones) < 1:
-        console.print("[bold red]There must be at least 1 milestone")
-        return False
     community.data.milestones = milestones
+    # countries and coordinates can only come from members with a location
+    located = [m for m in community.data.members if m["location"] is not None]
+    if len(located) < 2:
+        console.print(
+            "[bold red]Geographical information is not enough to compute geodispersion"
+        )
+        return False
     console.log("Retrieving geographical information")
 
     geographical_retriever.retrieve_geo_information(community)
@@ -78,25 +97,46 @@ def retrieve_member_data(community: community.Community):
     :param community: the analyzed community
     """
     aliases = alias_handler.alias_extraction(community)
+    apply_aliases(community, aliases)
 
     members = []
+    logins = community.data.members_logins
+    with Bar("Retrieving community members data...", max=len(logins)) as bar:
+        for i in range(0, len(logins), api_manager.GRAPHQL_BATCH_SIZE):
+            batch = logins[i : i + api_manager.GRAPHQL_BATCH_SIZE]
+            members.extend(api_manager.get_users_data_from_logins(batch))
+            bar.next(len(batch))
 
-    users = []
-    bots = []
-    organizations = []
+    classify_members(community, members)
+
+
+def apply_aliases(community: community.Community, aliases: dict):
+    """
+    Stores the computed aliases in the community data, using their keys as member logins,
+    and replaces the emails of the commits with the aliases.
 
+    :param community: the analyzed community
+    :param aliases: the mapping from each alias to its emails
+    """
     community.data.aliases = aliases
     community.data.members_logins = [key for key in aliases.keys()]
 
     community.data.commits = alias_handler.replace_all_aliases(
         community.data.commits, aliases
     )
-    with Bar(
-        "Retrieving community members data...", max=len(community.data.members_logins)
-    ) as bar:
-        for login in community.data.members_logins:
-            members.append(api_manager.get_user_data_from_login(login))
-            bar.next()
+
+
+def classify_members(community: community.Community, members: list):
+    """
+    Classifies the GitHub profiles of the members as users, bots and organizations,
+    and stores the users as the community members.
+
+    :param community: the analyzed community
+    :param members: the GitHub profiles of the members
+    """
+    users = []
+    bots = []
+    organizations = []
 
     for member in members:
         if member is not None and "type" in member.keys():
@@ -128,38 +168,70 @@ def retrieve_structure_data(community: community.Community):
 
     :param community: The community for which we need to retrieve GitHub Data
     """
+    members = community.data.members
+    logins = [member["login"] for member in members]
+    restricted_followers, restricted_following = split_by_fanout(members)
+    members_data = {}
+    with Bar("Filtering members data", max=len(members)) as bar:
+        with ThreadPoolExecutor(max_workers=MEMBER_WORKERS) as executor:
+            futures = [
+                executor.submit(
+                    retrieve_data_per_members,
+                    members[i : i + MEMBERS_PER_QUERY],
+                    restricted_followers,
+                    restricted_following,
+                )
+                for i in range(0, len(members), MEMBERS_PER_QUERY)
+            ]
+            for future in as_completed(futures):
+                chunk_data = future.result()
+                members_data.update(chunk_data)
+                bar.next(len(chunk_data))
     map_user_followers = {}
     map_user_following = {}
     map_user_repositories = {}
-    with Bar("Filtering members data", max=len(community.data.members)) as bar:
-        for member in community.data.members:
-            (
-                followers_login,
-                following_login,
-                repo_names,
-            ) = retrieve_data_per_member(member)
-            map_user_followers[member["login"]] = followers_login
-            map_user_following[member["login"]] = following_login
-            map_user_repositories[member["login"]] = repo_names
-            bar.next()
+    for member in members:
+        followers_login, following_login, repo_names = members_data[member["login"]]
+        map_user_followers[member["login"]] = followers_login
+        map_user_following[member["login"]] = following_login
+        map_user_repositories[member["login"]] = repo_names
+    pairs = follows_to_check(logins, restricted_followers, restricted_following)
+    checked = {}
+    with Bar("Checking follows between members", max=len(pairs)) as bar:
+        with ThreadPoolExecutor(max_workers=MEMBER_WORKERS) as executor:
+            futures = {
+                executor.submit(api_manager.is_following, *pair): pair for pair in pairs
+            }
+            for future in as_completed(futures):
+                checked[futures[future]] = future.result()
+                bar.next()
+    complete_follows(
+        logins,
+        map_user_followers,
+        map_user_following,
+        restricted_followers,
+        restricted_following,
+        checked,
+    )
     community.data.map_user_followers = map_user_followers
     community.data.map_user_following = map_user_following
     community.data.map_user_repositories = map_user_repositories
 
     filtered_prs = retrieve_and_filter_pull_requests(community)
     community.data.all_pull_requests = filtered_prs
-    # for each pull request that has been merged, retrieve detailed data
-    merged_pr_detailed = []
-    with Bar("Retrieving details for pull requests", max=len(filtered_prs)) as bar:
-        for pr in filtered_prs:
-            if pr["merged_at"] is not None:
-                merged_pr_detailed.append(
-                    api_manager.get_pr_details(
-                        community.repo_owner, community.repo_name, pr["number"]
-                    )
+    # for each pull request that has been merged, retrieve who merged it
+    numbers = [pr["number"] for pr in filtered_prs if pr["merged_at"] is not None]
+    merged_by = {}
+    with Bar("Retrieving details for pull requests", max=len(numbers)) as bar:
+        for i in range(0, len(numbers), api_manager.GRAPHQL_BATCH_SIZE):
+            batch = numbers[i : i + api_manager.GRAPHQL_BATCH_SIZE]
+            merged_by.update(
+                api_manager.get_prs_merged_by(
+                    community.repo_owner, community.repo_name, batch
                 )
-            bar.next()
-    community.data.merged_pull_requests = merged_pr_detailed
+            )
+            bar.next(len(batch))
+    community.data.merged_pull_requests = merged_pull_requests(numbers, merged_by)
     # retrieve pull request comments and map them to pull requests gatghered
 
     console.log("Retrieving and mapping comments to pull requests")
@@ -167,9 +239,87 @@ def retrieve_structure_data(community: community.Community):
     map_prs_to_comments(community)
 
 
-def retrieve_data_per_member(member):
+def merged_pull_requests(numbers: list, merged_by: dict):
+    """
+    Builds the merged pull requests from the logins of the users who merged them, keeping only
+    the fields used to compute the metrics.
+
+    :param numbers: the numbers of the merged pull requests
+    :param merged_by: for each pull request found, the login of the user who merged it (or None)
+    :return: the merged pull requests found, as {"number": ..., "merged_by": {"login": ...}}
+    """
+    return [
+        {
+            "number": number,
+            "merged_by": None
+            if merged_by[number] is None
+            else {"login": merged_by[number]},
+        }
+        for number in numbers
+        if number in merged_by
+    ]
+
+
+def retrieve_data_per_members(
+    members: list, restricted_followers: set, restricted_following: set
+):
+    """
+    Given some community members we retrieve their followers, following and repositories through
+    GraphQL, falling back to retrieve_data_per_member for the members GraphQL cannot resolve.
+
+    :param members: the members
+    :param restricted_followers: the members whose followers are not retrieved, see split_by_fanout
+    :param restricted_following: the members whose following are not retrieved
+    :return: for each member login, the logins of the followers and following and the names
+    of the repositories
+    """
+    connections = api_manager.get_users_connections(
+        {
+            member["login"]: connection_fields(
+                member["login"], restricted_followers, restricted_following
+            )
+            for member in members
+        }
+    )
+    members_data = {}
+    for member in members:
+        login = member["login"]
+        if login in connections:
+            members_data[login] = (
+                connections[login].get("followers", []),
+                connections[login].get("following", []),
+                connections[login]["repositories"],
+            )
+        else:
+            members_data[login] = retrieve_data_per_member(
+                member,
+                login not in restricted_followers,
+                login not in restricted_following,
+            )
+    return members_data
+
+
+def connection_fields(
+    login: str, restricted_followers: set, restricted_following: set
+):
+    """
+    :return: the GraphQL connections to retrieve for a member
+    """
+    fields = ["repositories"]
+    if login not in restricted_followers:
+        fields.append("followers")
+    if login not in restricted_following:
+        fields.append("following")
+    return fields
+
+
+def retrieve_data_per_member(
+    member, with_followers: bool = True, with_following: bool = True
+):
     """
     Given a community member we retrieve his/her followers and following, and we retrieve the repositories he/she worked on.
+    If they cannot be retrieved, the member is considered without followers, following and repositories.
+    The followers or the following list are left empty when not requested, see split_by_fanout.
     """
 
     if (
@@ -177,12 +327,111 @@ def retrieve_data_per_member(member):
         or member["following_url"] is None
         or member["repos_url"] is None
     ):
-        return
+        return [], [], []
+
+    try:
+        followers = []
+        if with_followers:
+            followers = api_manager.make_request(member["followers_url"])
+        following = []
+        if with_following:
+            following = api_manager.make_request(
+                str(member["following_url"]).split("{")[0]
+            )
+        repos = api_manager.make_request(member["repos_url"])
+    except api_manager.GitHubAPIError as e:
+        console.print(
+            "[bold red]Could not retrieve the data of {}: {}".format(member["login"], e)
+        )
+        return [], [], []
+
+    return extract_member_data(followers, following, repos)
+
+
+def split_by_fanout(members: list):
+    """
+    Only the follows between members are needed to compute the community structure. When the
+    followers (or following) list of a member spans more pages than the other members, it is
+    cheaper to check the follows with each other member than to retrieve the whole list.
+
+    :param members: the members, with their number of followers and following
+    :return: the logins of the members whose followers, and of those whose following,
+    are restricted to the other members
+    """
+    limit = len(members) - 1
+    restricted_followers = set()
+    restricted_following = set()
+    for member in members:
+        if pages(member.get("followers")) > limit:
+            restricted_followers.add(member["login"])
+        if pages(member.get("following")) > limit:
+            restricted_following.add(member["login"])
+    return restricted_followers, restricted_following
+
+
+def pages(count: int):
+    """
+    :return: the number of pages listing `count` items, 0 if unknown
+    """
+    if not count:
+        return 0
+    return -(-count // api_manager.PAGE_SIZE)
 
-    followers = api_manager.make_request(member["followers_url"])
-    following = api_manager.make_request(str(member["following_url"]).split("{")[0])
-    repos = api_manager.make_request(member["repos_url"])
 
+def follows_to_check(
+    logins: list, restricted_followers: set, restricted_following: set
+):
+    """
+    :return: the (follower, followed) pairs of members that must be checked one by one,
+    because neither the following list of the first nor the followers list of the second
+    are retrieved
+    """
+    return [
+        (login, other_login)
+        for login in logins
+        if login in restricted_following
+        for other_login in logins
+        if other_login != login and other_login in restricted_followers
+    ]
+
+
+def complete_follows(
+    logins: list,
+    map_user_followers: dict,
+    map_user_following: dict,
+    restricted_followers: set,
+    restricted_following: set,
+    checked: dict,
+):
+    """
+    Fills the restricted followers and following lists with the members they contain, derived
+    from the lists retrieved for the other members or from the follows checked one by one.
+    """
+    followers = {login: set(map_user_followers[login]) for login in logins}
+    following = {login: set(map_user_following[login]) for login in logins}
+
+    def follows(login, other_login):
+        if login not in restricted_following:
+            return other_login in following[login]
+        if other_login not in restricted_followers:
+            return login in followers[other_login]
+        return checked.get((login, other_login), False)
+
+    for login in restricted_followers:
+        map_user_followers[login] = [
+            other for other in logins if other != login and follows(other, login)
+        ]
+    for login in restricted_following:
+        map_user_following[login] = [
+            other for other in logins if other != login and follows(login, other)
+        ]
+
+
+def extract_member_data(followers: list, following: list, repos: list):
+    """
+    Given the followers, following and repositories of a member as returned by the API,
+    we extract the logins of the users and the names of the repositories.
+    """
     followers_login = (
         [f["login"] for f in followers if "login" in f.keys()]
         if len(followers) > 0
@@ -201,14 +450,36 @@ def retrieve_data_per_member(member):
 
 
 def retrieve_and_filter_pull_requests(community: community.Community):
+    """
+    Retrieves the pull requests within the time window, opened by members.
+    Pull requests are requested from the most recently updated, and the retrieval stops at the first
+    one updated before the time window, since none of the following ones can fall within it.
+    """
     console.log("Retrieving pull requests")
-    prs = api_manager.get_pull_requests(community.repo_owner, community.repo_name)
-    return filters.filter_prs(community, prs)
+    prs = api_manager.get_pull_requests(
+        community.repo_owner,
+        community.repo_name,
+        updated_since=community.data.start_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        stream=True,
+    )
+    return sort_pull_requests(filters.filter_prs(community, prs))
+
+
+def sort_pull_requests(prs: list):
+    """
+    Sorts pull requests from the most recently created, i.e. the default order of the GitHub API.
+    Pull requests listed twice, because they were updated while paginating, are kept once.
+    """
+    unique_prs = {pr["number"]: pr for pr in prs}
+    return sorted(unique_prs.values(), key=lambda pr: pr["number"], reverse=True)
 
 
 def retrieve_and_filter_pr_comments(community: community.Community):
     comments = api_manager.get_prs_comments(
-        community.repo_owner, community.repo_name, community.data.start_date.isoformat()
+        community.repo_owner,
+        community.repo_name,
+        community.data.start_date.isoformat(),
+        stream=True,
     )
 
     filtered_comments = filters.filter_comments(community, comments)
@@ -245,62 +516,96 @@ def retrieve_miscellaneous_data(community: community.Community):
 
 
 def retrieve_commits_details(community: community.Community):
-    commits = community.data.commits
-    modified_files_per_commit = {}
-    with Bar("Retrieving commits details...", max=len(commits)) as bar:
-        for commit in commits:
-            files = list(commit.stats.files.keys())
-            modified_files_per_commit[commit.hexsha] = files
-            bar.next()
-
-    community.data.modified_files_per_commit = modified_files_per_commit
+    retrieve_activity(community)
+    console.log("Retrieving commit comments")
+    retrieve_commits_comments(community)
+
+
+def retrieve_activity(community: community.Community):
+    """
+    Retrieves from the activity index of the repository the commits and the files they modified
+    within the time window, replacing authors and committers with their aliases.
+    The index is expected to be up to date, see repository_manager.update_activity_index.
+    """
+    window = TimeWindow.of(community)
+    index = repository_manager.open_activity_index(
+        community.repo_owner, community.repo_name
+    )
+    try:
+        commits_per_day = index.commits_per_day(window.start // DAY, window.end // DAY)
+        file_touches = index.file_touches(window.start // DAY, window.end // DAY)
+    finally:
+        index.close()
+    transposed = alias_handler.transpose_aliases(community.data.aliases)
+    community.data.commits_per_day = [
+        (
+            *alias_handler.replace_aliases(author, committer, transposed),
+            authored_day,
+            committed_day,
+            commits,
+        )
+        for author, committer, authored_day, committed_day, commits in commits_per_day
+    ]
+    community.data.file_touches = [
+        (file, transposed.get(author, author), committed_day, touches)
+        for file, author, committed_day, touches in file_touches
+    ]
+
     console.log("Retrieving first and last commit details")
     (
         first_commit_datetime,
         first_commit_hash,
         last_commit_datetime,
         last_commit_hash,
-    ) = filters.filter_first_last_commits(commits)
+    ) = filters.filter_first_last_commits(community.data.commits)
     community.data.first_commit_datetime = first_commit_datetime
     community.data.first_commit_hash = first_commit_hash
     community.data.last_commit_datetime = last_commit_datetime
     community.data.last_commit_hash = last_commit_hash
-    console.log("Retrieving commit comments")
+
+
+def retrieve_commits_comments(community: community.Community):
     comments = api_manager.get_commits_comments(
-        community.repo_owner, community.repo_name
+        community.repo_owner,
+        community.repo_name,
+        since=community.data.start_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        stream=True,
     )
-    community.data.commits_comments = filters.filter_comments(community, comments)
+    # comments are retrieved from the most recent one, store them oldest first as listed by GitHub
+    community.data.commits_comments = filters.filter_comments(community, comments)[::-1]
 
 
 def retrieve_active_users(community: community.Community):
+    """
+    Members are active if they authored or committed a commit in the last 30 days of the
+    time window.
+    """
+    window = TimeWindow.of(community)
     active_users = []
-    date_30 = community.data.end_date - timedelta(days=30)
-    for commit in community.data.commits:
-        if (commit.author.email not in active_users) and (
-            date_30
-            <= datetime.strptime(convert_date(commit.authored_date), "%Y-%m-%d")
-            <= community.data.end_date
-        ):
-            active_users.append(commit.author.email)
+    for row in community.data.commits_per_day:
+        author, committer, authored_day, committed_day, _ = row
+        if (author not in active_users) and window.is_recent(authored_day * DAY):
+            active_users.append(author)
         if (
-            commit.committer.email != commit.author.email
-            and (commit.committer.email not in active_users)
-            and (
-                date_30
-                <= datetime.strptime(convert_date(commit.committed_date), "%Y-%m-%d")
-                <= community.data.end_date
-            )
+            committer != author
+            and (committer not in active_users)
+            and window.is_recent(committed_day * DAY)
         ):
-            active_users.append(commit.committer.email)
+            active_users.append(committer)
     community.data.active_members = active_users
 
 
 def retrieve_watchers_and_stargazers(community: community.Community):
-    community.data.watchers = api_manager.get_watchers(
-        community.repo_owner, community.repo_name
-    )
-    community.data.stargazers = api_manager.get_stargazers(
-        community.repo_owner, community.repo_name
-    )
-
-    pass
+    # only the logins are needed, so users are reduced to their login as they are retrieved
+    community.data.watchers = [
+        {"login": user["login"]}
+        for user in api_manager.get_watchers(
+            community.repo_owner, community.repo_name, stream=True
+        )
+    ]
+    community.data.stargazers = [
+        {"login": user["login"]}
+        for user in api_manager.get_stargazers(
+            community.repo_owner, community.repo_name, stream=True
+        )
+    ]
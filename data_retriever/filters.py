@@ -1,30 +1,27 @@
-from utils import (
-    convert_date,
-    check_date_within_timewindow,
-    check_githubdate_within_timewindow,
-)
+from utils import check_githubdate_within_timewindow
 from datetime import datetime
+from time_window import TimeWindow, day, to_datetime, to_epoch
 from community import community
 from io_module import api_manager
 from console import console
 from progress.bar import Bar
+from progress.counter import Counter
 
 
 def filter_commits(community: community.Community):
     """
     This function filters commits within the given time window.
+    Commits are read once, so they can be streamed from the repository.
 
     :param community: the community
     """
+    window = TimeWindow.of(community)
     filtered_commits = []
     for commit in community.data.all_commits:
-        try:
-            if check_date_within_timewindow(
-                community, commit.committed_date
-            ) or check_date_within_timewindow(community, commit.authored_date):
-                filtered_commits.append(commit)
-        except:
-            continue
+        if window.contains(commit.committed_date) or window.contains(
+            commit.authored_date
+        ):
+            filtered_commits.append(commit)
 
     community.data.commits = filtered_commits
 
@@ -44,7 +41,11 @@ def filter_milestones(community: community.Community, milestones: list):
     return filtered_milestones
 
 
-def filter_prs(community: community.Community, prs: list):
+def filter_prs(community: community.Community, prs):
+    """
+    Filter out all pull requests that are not within the time window or not opened by members.
+    Pull requests can be given as a list or as a stream, e.g. as returned by the API while it is paginating.
+    """
     filtered_prs = []
 
     for pr in prs:
@@ -68,13 +69,14 @@ def filter_prs(community: community.Community, prs: list):
     return filtered_prs
 
 
-def filter_comments(community: community.Community, comments: list):
+def filter_comments(community: community.Community, comments):
     """
     Filter out all comments that are not within the time window, do not have an author,
     or are not considered current members (i.e., have not committed in the last 90 days).
+    Comments can be given as a list or as a stream, e.g. as returned by the API while it is paginating.
     """
     filtered_comments = []
-    with Bar("Filtering comments", max=len(comments)) as bar:
+    with progress("Filtering comments", comments) as bar:
         for comment in comments:
             try:
                 if (
@@ -100,24 +102,43 @@ def filter_comments(community: community.Community, comments: list):
 
 
 def filter_first_last_commits(commits: list):
-    last_commit_datetime = datetime.strptime("1980-01-01", "%Y-%m-%d")
+    last_commit_day = day(to_epoch(datetime(1980, 1, 1)))
     last_commit_hash = ""
-    first_commit_datetime = datetime.today()
+    first_commit_day = day(to_epoch(datetime.today()))
     first_commit_hash = ""
 
     for commit in commits:
-        current_commit_date = datetime.strptime(
-            convert_date(commit.committed_date), "%Y-%m-%d"
-        )
-        if current_commit_date > last_commit_datetime:
-            last_commit_datetime = current_commit_date
+        current_commit_day = day(commit.committed_date)
+        if current_commit_day > last_commit_day:
+            last_commit_day = current_commit_day
             last_commit_hash = commit.hexsha
-        if current_commit_date < first_commit_datetime:
-            first_commit_datetime = current_commit_date
+        if current_commit_day < first_commit_day:
+            first_commit_day = current_commit_day
             first_commit_hash = commit.hexsha
     return (
-        first_commit_datetime,
+        to_datetime(first_commit_day),
         first_commit_hash,
-        last_commit_datetime,
+        to_datetime(last_commit_day),
         last_commit_hash,
     )
+
+
+def filter_first_last_dates(committers_activity: dict):
+    """
+    This function finds the dates of the first and last commit of the history.
+
+    :param committers_activity: for each committer, the epochs of the first and last commit
+    :return: the dates of the first and last commit
+    """
+    first = min(dates[0] for dates in committers_activity.values())
+    last = max(dates[1] for dates in committers_activity.values())
+    return to_datetime(day(first)), to_datetime(day(last))
+
+
+def progress(message: str, items):
+    """
+    This function returns a progress bar for a list of items, or a counter for a stream of items.
+    """
+    if hasattr(items, "__len__"):
+        return Bar(message, max=len(items))
+    return Counter(message + " ")
@@ -1,10 +1,17 @@
 from geopy.geocoders import Nominatim
+from geopy.location import Location
 from console import console
 import pandas as pd
 from community import community
 from geodispersion import globe_data_reader
+from io_module import api_manager
+from io_module.cassette import Cassette
+import json
 import time
 
+# endpoint template under which the geocoding requests are recorded in the telemetry
+NOMINATIM_ENDPOINT = "GET nominatim/search"
+
 
 def retrieve_geo_information(community: community.Community):
     geolocator = Nominatim(user_agent="yoshi3")
@@ -13,13 +20,21 @@ def retrieve_geo_information(community: community.Community):
     for member in community.data.members:
         if member["location"] is not None:
             result = None
+            status = None
+            start = time.perf_counter()
             try:
-                result = geolocator.geocode(
-                    member["location"], addressdetails=True, language="en"
-                )
-                time.sleep(1)
+                result = geocode(geolocator, member["location"])
+                status = 200
             except:
                 pass
+            api_manager.telemetry.record(
+                NOMINATIM_ENDPOINT,
+                time.perf_counter() - start,
+                size=0 if result is None else len(json.dumps(result.raw)),
+                status=status,
+            )
+            if status is not None and not replaying():
+                time.sleep(1)
             if result is not None and result.raw is not None:
                 member["location"] = result.raw
                 member_lat = float(member["location"]["lat"])
@@ -33,6 +48,40 @@ def retrieve_geo_information(community: community.Community):
     community.data.coordinates = coordinates
 
 
+def geocode(geolocator: Nominatim, location: str):
+    """
+    This function geocodes a location, through the cassette of the analysis if one is in use.
+
+    :param geolocator: the geocoder
+    :param location: the location to geocode
+    :return: the geopy Location found, or None
+    """
+    cassette = api_manager.get_cassette()
+    key = Cassette.key("GEOCODE", location)
+    if replaying():
+        raw = cassette.play(key)["raw"]
+        if raw is None:
+            return None
+        point = (float(raw["lat"]), float(raw["lon"]))
+        return Location(raw["display_name"], point, raw)
+    start = time.perf_counter()
+    result = geolocator.geocode(location, addressdetails=True, language="en")
+    if cassette is not None:
+        cassette.record(
+            key,
+            {
+                "raw": None if result is None else result.raw,
+                "elapsed": round(time.perf_counter() - start, 4),
+            },
+        )
+    return result
+
+
+def replaying():
+    cassette = api_manager.get_cassette()
+    return cassette is not None and cassette.mode == "replay"
+
+
 def retrieve_country_name(community: community.Community):
     countries = []
 
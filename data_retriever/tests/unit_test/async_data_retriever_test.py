@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime
+import pytest
+from community.community import Community
+from community.data import Data
+from data_retriever import data_retriever, async_data_retriever
+from io_module import api_manager
+from io_module.tests.github_stub import GitHubStub
+
+
+pytestmark = pytest.mark.usefixtures("fresh_session")
+
+
+def build_community(stub):
+    community = Community("owner", "repo")
+    data = Data()
+    data.start_date = datetime(2023, 1, 1)
+    data.end_date = datetime(2023, 3, 31)
+    data.members_logins = ["alice", "bob"]
+    data.members = []
+    for login in data.members_logins:
+        user_url = "{}/users/{}".format(stub.url, login)
+        data.members.append(
+            {
+                "login": login,
+                "followers_url": user_url + "/followers",
+                "following_url": user_url + "/following{/other_user}",
+                "repos_url": user_url + "/repos",
+            }
+        )
+    community.add_data(data)
+    return community
+
+
+def register_routes(stub):
+    stub.paged("/users/alice/followers", [{"login": "bob"}])
+    stub.paged("/users/alice/following", [])
+    stub.paged("/users/alice/repos", [{"name": "toad"}, {"name": "yoshi"}])
+    stub.paged("/users/bob/followers", [])
+    stub.paged("/users/bob/following", [{"login": "alice"}])
+    stub.paged("/users/bob/repos", [{"name": "toad"}])
+    prs = [
+        {
+            "number": n,
+            "created_at": "2023-02-0{}T10:00:00Z".format(n),
+            "updated_at": "2023-02-0{}T10:00:00Z".format(n),
+            "closed_at": "2023-02-0{}T12:00:00Z".format(n),
+            "merged_at": "2023-02-0{}T12:00:00Z".format(n) if n % 2 else None,
+            "user": {"login": "alice" if n % 2 else "bob"},
+        }
+        for n in range(1, 6)
+    ]
+    stub.paged("/repos/owner/repo/pulls", prs, per_page=2)
+    for n in range(1, 6):
+        stub.routes["/repos/owner/repo/pulls/{}".format(n)] = (
+            lambda q, h, b, n=n: (200, {}, {"number": n, "merged_by": {"login": "alice"}})
+        )
+    comments = [
+        {
+            "created_at": "2023-02-02T11:00:00Z",
+            "updated_at": "2023-02-02T11:00:00Z",
+            "user": {"login": "alice"},
+            "pull_request_url": stub.url + "/repos/owner/repo/pulls/2",
+        }
+    ]
+    stub.paged("/repos/owner/repo/pulls/comments", comments)
+
+
+def test_async_structure_data_matches_sync(monkeypatch):
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        register_routes(stub)
+        sync_community = build_community(stub)
+        data_retriever.retrieve_structure_data(sync_community)
+        async_community = build_community(stub)
+        asyncio.run(async_data_retriever.retrieve_structure_data(async_community))
+
+    assert async_community.data == sync_community.data
+    assert async_community.data.map_user_repositories == {
+        "alice": ["toad", "yoshi"],
+        "bob": ["toad"],
+    }
+    assert [pr["number"] for pr in async_community.data.merged_pull_requests] == [5, 3, 1]
+
+
+def test_member_failure_does_not_abort_structure_data(monkeypatch):
+    """
+    A member whose data cannot be retrieved is kept without followers, following and repositories.
+    """
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        register_routes(stub)
+        del stub.routes["/users/alice/repos"]
+        sync_community = build_community(stub)
+        data_retriever.retrieve_structure_data(sync_community)
+        async_community = build_community(stub)
+        asyncio.run(async_data_retriever.retrieve_structure_data(async_community))
+
+    for community in (sync_community, async_community):
+        assert community.data.map_user_followers == {"alice": [], "bob": []}
+        assert community.data.map_user_following == {"alice": [], "bob": ["alice"]}
+        assert community.data.map_user_repositories == {"alice": [], "bob": ["toad"]}
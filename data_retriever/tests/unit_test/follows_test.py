@@ -0,0 +1,91 @@
+from datetime import datetime
+import networkx as nx
+import pytest
+from community.community import Community
+from community.data import Data
+from data_processor import structure_processor
+from data_retriever import data_retriever
+from io_module import api_manager
+from io_module.tests.github_stub import GitHubStub
+
+STRANGERS = ["stranger{}".format(i) for i in range(1000)]
+FOLLOWS = {
+    "alice": ["carol"],
+    "bob": ["alice", "carol"] + STRANGERS[:498],
+    "carol": ["alice", "bob"],
+}
+FOLLOWS.update({stranger: ["alice"] for stranger in STRANGERS[:998]})
+
+
+pytestmark = pytest.mark.usefixtures("fresh_session")
+
+
+def register_routes(stub):
+    for login in ("alice", "bob", "carol"):
+        followers = [{"login": user} for user in FOLLOWS if login in FOLLOWS[user]]
+        stub.paged("/users/{}/followers".format(login), followers)
+        following = [{"login": user} for user in FOLLOWS[login]]
+        stub.paged("/users/{}/following".format(login), following)
+        stub.paged("/users/{}/repos".format(login), [])
+        for other in ("alice", "bob", "carol"):
+            status = 204 if other in FOLLOWS[login] else 404
+            stub.routes["/users/{}/following/{}".format(login, other)] = (
+                lambda q, h, b, status=status: (status, {}, None)
+            )
+
+
+def build_community(stub):
+    community = Community("owner", "repo")
+    data = Data()
+    data.start_date = datetime(2023, 1, 1)
+    data.end_date = datetime(2023, 3, 31)
+    data.members_logins = ["alice", "bob", "carol"]
+    data.members = []
+    for login in data.members_logins:
+        user_url = "{}/users/{}".format(stub.url, login)
+        data.members.append(
+            {
+                "login": login,
+                "followers": len([u for u in FOLLOWS if login in FOLLOWS[u]]),
+                "following": len(FOLLOWS[login]),
+                "followers_url": user_url + "/followers",
+                "following_url": user_url + "/following{/other_user}",
+                "repos_url": user_url + "/repos",
+            }
+        )
+    community.add_data(data)
+    return community
+
+
+def follow_connections(community):
+    return structure_processor.compute_follows_connection(community, nx.Graph())
+
+
+def test_high_fanout_members_are_checked_pairwise(monkeypatch):
+    """
+    Members with more followers (or following) pages than members are not listed in full,
+    and the follows between members are the same.
+    """
+    monkeypatch.setattr(
+        data_retriever, "retrieve_and_filter_pull_requests", lambda community: []
+    )
+    monkeypatch.setattr(
+        data_retriever, "retrieve_and_filter_pr_comments", lambda community: None
+    )
+    monkeypatch.setattr(data_retriever, "map_prs_to_comments", lambda community: None)
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        register_routes(stub)
+        adaptive = build_community(stub)
+        data_retriever.retrieve_structure_data(adaptive)
+        adaptive_requests = len(stub.requests)
+
+        monkeypatch.setattr(data_retriever, "split_by_fanout", lambda m: (set(), set()))
+        full = build_community(stub)
+        data_retriever.retrieve_structure_data(full)
+        full_requests = len(stub.requests) - adaptive_requests
+
+    assert adaptive.data.map_user_followers["alice"] == ["bob", "carol"]
+    assert adaptive.data.map_user_following["bob"] == ["alice", "carol"]
+    assert follow_connections(adaptive) == follow_connections(full)
+    assert adaptive_requests < full_requests
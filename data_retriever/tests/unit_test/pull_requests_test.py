@@ -0,0 +1,76 @@
+import random
+from datetime import datetime, timedelta
+import pytest
+from community.community import Community
+from community.data import Data
+from data_retriever import data_retriever, filters
+from io_module import api_manager
+from io_module.tests.github_stub import GitHubStub
+
+
+pytestmark = pytest.mark.usefixtures("fresh_session")
+
+
+def github_date(date: datetime):
+    return date.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def generate_prs(count: int):
+    """
+    Generates pull requests created over three years, some of them updated or closed much later.
+    """
+    rng = random.Random(42)
+    first = datetime(2020, 1, 1)
+    prs = []
+    for number in range(1, count + 1):
+        created = first + timedelta(hours=number * 24 * 3 * 365 / count)
+        updated = created + timedelta(days=rng.choice([0, 1, 10, 100, 400]))
+        closed = min(updated, created + timedelta(days=1))
+        if rng.random() < 0.2:
+            closed = None
+        prs.append(
+            {
+                "number": number,
+                "created_at": github_date(created),
+                "updated_at": github_date(updated),
+                "closed_at": None if closed is None else github_date(closed),
+                "merged_at": None,
+                "user": {"login": rng.choice(["alice", "bob", "carol"])},
+            }
+        )
+    return prs
+
+
+def listing_order(query):
+    """
+    Orders the pull requests as GitHub does, by creation date or, if requested, by update date.
+    """
+    key = "updated_at" if query.get("sort") == "updated" else "created_at"
+    return lambda pr: pr[key]
+
+
+def test_window_bounded_retrieval_matches_full_scan(monkeypatch):
+    prs = generate_prs(3000)
+    community = Community("owner", "repo")
+    data = Data()
+    data.start_date = datetime(2022, 1, 1)
+    data.end_date = datetime(2022, 3, 31)
+    data.members_logins = ["alice", "bob"]
+    community.add_data(data)
+
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        stub.paged(
+            "/repos/owner/repo/pulls",
+            lambda query: sorted(prs, key=listing_order(query), reverse=True),
+        )
+        full_scan = filters.filter_prs(
+            community, api_manager.get_pull_requests("owner", "repo")
+        )
+        full_scan_requests = len(stub.requests)
+        bounded = data_retriever.retrieve_and_filter_pull_requests(community)
+        bounded_requests = len(stub.requests) - full_scan_requests
+
+    assert len(full_scan) > 0
+    assert bounded == full_scan
+    assert bounded_requests < full_scan_requests
@@ -0,0 +1,46 @@
+import datetime
+import random
+from types import SimpleNamespace
+from time_window import DAY, TimeWindow, day, to_datetime, to_epoch
+from utils import check_date_within_timewindow, convert_date
+
+
+def check_month(start_date, end_date, date):
+    # the month checks that the time window replaces, on dates built from convert_date
+    for month in (2, 1, 0):
+        if end_date > date > start_date + datetime.timedelta(days=30 * month):
+            return month
+    return None
+
+
+def test_time_window_matches_date_checks():
+    """
+    The epoch bounds select the same days as the checks on the dates parsed from convert_date,
+    for windows starting and ending at midnight or within a day.
+    """
+    random.seed(0)
+    windows = [
+        (datetime.datetime(2023, 1, 1), datetime.datetime(2023, 3, 31)),
+        (datetime.datetime(2023, 1, 1, 12, 30), datetime.datetime(2023, 4, 1, 6)),
+    ]
+    for start_date, end_date in windows:
+        community = SimpleNamespace(
+            data=SimpleNamespace(start_date=start_date, end_date=end_date)
+        )
+        window = TimeWindow.of(community)
+        recent_date = end_date - datetime.timedelta(days=30)
+        # random epochs, and the epochs around the midnights next to the bounds
+        epochs = [random.randint(1670000000, 1683000000) for _ in range(5000)]
+        bounds = [start_date, end_date, recent_date]
+        bounds += [start_date + datetime.timedelta(days=days) for days in (30, 60)]
+        for bound in bounds:
+            midnight = day(to_epoch(bound)) * DAY
+            epochs += [midnight + days * DAY + s for days in range(-2, 3) for s in (-1, 0)]
+        for epoch in epochs:
+            date = datetime.datetime.strptime(convert_date(epoch), "%Y-%m-%d")
+            assert to_datetime(day(epoch)) == date
+            assert window.contains(epoch) == check_date_within_timewindow(
+                community, epoch
+            )
+            assert window.is_recent(epoch) == (recent_date <= date <= end_date)
+            assert window.month(epoch) == check_month(start_date, end_date, date)
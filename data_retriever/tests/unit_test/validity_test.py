@@ -0,0 +1,75 @@
+from datetime import datetime
+import pytest
+from community.commit import Commit
+from community.community import Community
+from community.data import Data
+from data_retriever import data_retriever, geographical_retriever
+from io_module import api_manager
+from io_module.tests.github_stub import GitHubStub
+
+
+pytestmark = pytest.mark.usefixtures("fresh_session")
+
+
+def build_community(authors: list):
+    committed_date = datetime(2023, 2, 1).timestamp()
+    commits = []
+    for i in range(120):
+        author = authors[i % len(authors)]
+        commits.append(
+            Commit(
+                "{:040x}".format(i), author, author, committed_date, committed_date
+            )
+        )
+    community = Community("owner", "repo")
+    data = Data()
+    data.start_date = datetime(2023, 1, 1)
+    data.end_date = datetime(2023, 3, 31)
+    data.all_commits = commits
+    community.add_data(data)
+    return community
+
+
+def test_single_author_fails_without_requests(monkeypatch):
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        community = build_community(["alice@example.com"])
+        assert not data_retriever.retrieve_data_and_check_validity(community)
+        assert stub.requests == []
+
+
+def test_missing_milestones_fail_with_one_request(monkeypatch):
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        stub.paged("/repos/owner/repo/milestones", [])
+        community = build_community(["alice@example.com", "bob@example.com"])
+        assert not data_retriever.retrieve_data_and_check_validity(community)
+        assert [request[1] for request in stub.requests] == [
+            "/repos/owner/repo/milestones"
+        ]
+        assert stub.requests[0][2] == {"state": "all", "per_page": "1"}
+
+
+def test_members_without_location_are_not_geocoded(monkeypatch):
+    def geocoding(community):
+        raise AssertionError("members should not be geocoded")
+
+    monkeypatch.setattr(geographical_retriever, "retrieve_geo_information", geocoding)
+    monkeypatch.setattr(
+        data_retriever,
+        "retrieve_member_data",
+        lambda community: setattr(
+            community.data,
+            "members",
+            [
+                {"login": "alice", "location": "Salerno"},
+                {"login": "bob", "location": None},
+            ],
+        ),
+    )
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        stub.paged("/repos/owner/repo/milestones", [{"number": 1}])
+        community = build_community(["alice@example.com", "bob@example.com"])
+        assert not data_retriever.retrieve_data_and_check_validity(community)
+    assert community.data.milestones == [{"number": 1}]
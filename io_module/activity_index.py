@@ -0,0 +1,167 @@
+import os
+import sqlite3
+from time_window import DAY
+
+"""
+This module contains a persistent index of the commit activity of a repository, extended with
+the commits pushed since the last analysis instead of being computed again from the history
+"""
+
+# number of commits aggregated in memory before their counts are written to the database
+FLUSH_COMMITS = 10000
+
+
+class ActivityIndex:
+    """
+    This class stores in a SQLite database, for the whole history of a repository:
+    the number of commits per author, committer, authored day and committed day; the number of
+    commits touching each file per author and committed day; the epochs of the first and last
+    commit of each committer. Days are UTC day numbers, see time_window.day.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: the path of the SQLite database storing the index
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+            "CREATE TABLE IF NOT EXISTS commits ("
+            "author TEXT, committer TEXT, authored_day INTEGER, committed_day INTEGER, "
+            "commits INTEGER, "
+            "PRIMARY KEY (author, committer, authored_day, committed_day));"
+            "CREATE INDEX IF NOT EXISTS commits_by_committed_day "
+            "ON commits (committed_day);"
+            "CREATE TABLE IF NOT EXISTS file_touches ("
+            "file TEXT, author TEXT, committed_day INTEGER, touches INTEGER, "
+            "PRIMARY KEY (committed_day, file, author));"
+            "CREATE TABLE IF NOT EXISTS committers ("
+            "committer TEXT PRIMARY KEY, first INTEGER, last INTEGER);"
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def head(self):
+        """
+        :return: the SHA of the last indexed commit, None if the index is empty
+        """
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'head'"
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def clear(self):
+        with self.connection:
+            for table in ("meta", "commits", "file_touches", "committers"):
+                self.connection.execute("DELETE FROM " + table)
+
+    def add(self, activity, head: str):
+        """
+        This function adds commits to the index, and records the new last indexed commit.
+        The counts are written every FLUSH_COMMITS commits, within a single transaction.
+
+        :param activity: the (commit.Commit, modified files) pairs of the commits to add,
+        each commit being added once
+        :param head: the SHA of the last indexed commit after the addition
+        """
+        commits = {}
+        file_touches = {}
+        committers = {}
+        pending = 0
+        with self.connection:
+            for commit, files in activity:
+                authored_day = commit.authored_date // DAY
+                committed_day = commit.committed_date // DAY
+                key = (commit.author, commit.committer, authored_day, committed_day)
+                commits[key] = commits.get(key, 0) + 1
+                for file in files:
+                    key = (file, commit.author, committed_day)
+                    file_touches[key] = file_touches.get(key, 0) + 1
+                dates = committers.setdefault(
+                    commit.committer, [commit.committed_date, commit.committed_date]
+                )
+                dates[0] = min(dates[0], commit.committed_date)
+                dates[1] = max(dates[1], commit.committed_date)
+                pending += 1
+                if pending == FLUSH_COMMITS:
+                    self.write(commits, file_touches, committers)
+                    commits, file_touches, committers = {}, {}, {}
+                    pending = 0
+            self.write(commits, file_touches, committers)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('head', ?)", (head,)
+            )
+
+    def write(self, commits: dict, file_touches: dict, committers: dict):
+        """
+        This function adds aggregated counts to the ones stored, without committing them.
+
+        :param commits: the number of commits per (author, committer, authored day, committed
+        day)
+        :param file_touches: the number of commits per (file, author, committed day)
+        :param committers: the [first, last] commit epochs per committer
+        """
+        self.connection.executemany(
+            "INSERT INTO commits VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT DO UPDATE SET commits = commits + excluded.commits",
+            [key + (count,) for key, count in commits.items()],
+        )
+        self.connection.executemany(
+            "INSERT INTO file_touches VALUES (?, ?, ?, ?) "
+            "ON CONFLICT DO UPDATE SET touches = touches + excluded.touches",
+            [key + (count,) for key, count in file_touches.items()],
+        )
+        self.connection.executemany(
+            "INSERT INTO committers VALUES (?, ?, ?) "
+            "ON CONFLICT DO UPDATE SET first = MIN(first, excluded.first), "
+            "last = MAX(last, excluded.last)",
+            [(committer, *dates) for committer, dates in committers.items()],
+        )
+
+    def total_commits(self):
+        return self.connection.execute(
+            "SELECT COALESCE(SUM(commits), 0) FROM commits"
+        ).fetchone()[0]
+
+    def committers_activity(self):
+        """
+        :return: for each committer, the [first, last] commit epochs
+        """
+        return {
+            committer: [first, last]
+            for committer, first, last in self.connection.execute(
+                "SELECT committer, first, last FROM committers"
+            )
+        }
+
+    def commits_per_day(self, first_day: int, end_day: int):
+        """
+        :param first_day: the first day of a time window
+        :param end_day: the day after the last day of the time window
+        :return: the (author, committer, authored day, committed day, commits) rows of the
+        commits authored or committed within the time window
+        """
+        return self.connection.execute(
+            "SELECT author, committer, authored_day, committed_day, commits FROM commits "
+            "WHERE committed_day >= ?1 AND committed_day < ?2 "
+            "OR authored_day >= ?1 AND authored_day < ?2",
+            (first_day, end_day),
+        ).fetchall()
+
+    def file_touches(self, first_day: int, end_day: int):
+        """
+        :param first_day: the first day of a time window
+        :param end_day: the day after the last day of the time window
+        :return: the (file, author, committed day, touches) rows of the commits committed
+        within the time window
+        """
+        return self.connection.execute(
+            "SELECT file, author, committed_day, touches FROM file_touches "
+            "WHERE committed_day >= ? AND committed_day < ?",
+            (first_day, end_day),
+        ).fetchall()
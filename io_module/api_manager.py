@@ -1,107 +1,725 @@
-import sys
-
 import requests
 import os
 import json
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from requests.auth import AuthBase
+from urllib3.util.retry import Retry
 from console import console
+from io_module.rate_limiter import RateLimiter
+from io_module.http_cache import HTTPCache
+from io_module.token_pool import TokenPool
+from io_module.telemetry import Telemetry, endpoint_template
+from io_module.cassette import Cassette, CassetteAdapter
 
 load_dotenv(".env")
 dot_env_path = ".env"
 
-GIT_PAT = os.environ.get("PAT", "")
+GITHUB_API_URL = "https://api.github.com"
+
+# connection pool and retry policy of the shared HTTP session; requests beyond the size of the
+# pool (e.g. pages prefetched by several threads at once) wait for a connection to be free
+POOL_SIZE = 20
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 1  # seconds, doubled at each retry
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+REQUEST_TIMEOUT = 30  # seconds
+# persistent cache of the responses, used to send conditional requests
+HTTP_CACHE_PATH = os.environ.get(
+    "HTTP_CACHE_PATH", os.path.join("cache", "github_http_cache.sqlite")
+)
+# size cap of the cached bodies, 0 disables the cache
+HTTP_CACHE_MAX_MB = float(os.environ.get("HTTP_CACHE_MAX_MB", 512))
+# number of items requested per page
+PAGE_SIZE = 100
+# number of pages retrieved concurrently when the number of pages is known
+PAGE_WORKERS = 8
+# number of objects looked up by a single GraphQL query
+GRAPHQL_BATCH_SIZE = 100
+# number of pages of followers, following or repositories retrieved by a single GraphQL query
+CONNECTIONS_BATCH_SIZE = 30
+# how many times a request rejected by the rate limit is sent again
+MAX_RATE_LIMIT_WAITS = 10
+# "record" captures the responses of each community into a cassette, "replay" serves them back
+CASSETTE_MODE = os.environ.get("CASSETTE_MODE", "off").lower()
+CASSETTE_DIR = os.environ.get("CASSETTE_DIR", "cassettes")
+# in replay mode, milliseconds waited before each response, or "recorded" to wait as recorded
+CASSETTE_LATENCY = os.environ.get("CASSETTE_LATENCY", "0")
 
-# TODO X-RateLimit-Remaining
 """
 This module contains functions to access the GitHub APIs
 """
 
 
-def get_milestones(owner: str, name: str):
-    response = paginate(
-        "https://api.github.com/repos/{0}/{1}/milestones?state=all&per_page=100".format(
-            owner, name
+class GitHubAPIError(Exception):
+    """
+    Raised when a paginated request to the GitHub API cannot be completed, even after retrying.
+    """
+
+
+class BearerAuth(AuthBase):
+    """
+    Token authentication, required by the GraphQL API.
+    """
+
+    def __init__(self, token: str):
+        self.token = token
+
+    def __call__(self, request):
+        request.headers["Authorization"] = "bearer " + self.token
+        return request
+
+
+_session = None
+_http_cache = None
+_token_pool = None
+_cassette = None
+_request_slots = None
+# per-thread settings, see sequential_pages
+_local = threading.local()
+
+rate_limiter = RateLimiter()
+telemetry = Telemetry()
+
+
+def get_session():
+    """
+    This function returns the HTTP session shared by all the requests to the GitHub API.
+    The session keeps connections alive between requests and retries transient failures
+    (connection errors and 5xx responses) with exponential backoff.
+    At most POOL_SIZE requests are sent at once through it (see dispatch), so that no
+    connection is opened beyond the pool and then discarded.
+
+    :return: the shared requests Session
+    """
+    global _session, _request_slots
+    if _session is None:
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["GET", "POST"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry
         )
+        if _cassette is not None:
+            adapter = CassetteAdapter(_cassette, adapter)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _request_slots = threading.BoundedSemaphore(POOL_SIZE)
+        _session = session
+    return _session
+
+
+def get_token_pool():
+    """
+    This function returns the pool of tokens authenticating the requests, loaded from the
+    PATS (comma separated) and PAT environment variables.
+
+    :return: the shared TokenPool
+    """
+    global _token_pool
+    if _token_pool is None:
+        _token_pool = TokenPool.from_environment(rate_limiter)
+    return _token_pool
+
+
+def get_http_cache():
+    """
+    This function returns the persistent cache of GitHub responses.
+
+    :return: the shared HTTPCache, or None if the cache is disabled or a cassette is in use
+    """
+    global _http_cache
+    if _cassette is not None:
+        # cassettes hold complete responses, independent of what was cached before
+        return None
+    if _http_cache is None and HTTP_CACHE_MAX_MB > 0:
+        _http_cache = HTTPCache(HTTP_CACHE_PATH, int(HTTP_CACHE_MAX_MB * 1024 * 1024))
+    return _http_cache
+
+
+def start_cassette(owner: str, name: str):
+    """
+    This function starts recording or replaying the responses of the analysis of a repository,
+    according to CASSETTE_MODE. The cassette is stored in CASSETTE_DIR.
+
+    :param owner: the owner of the repository
+    :param name: the name of the repository
+    :return: the cassette, or None if cassettes are disabled
+    """
+    global _cassette, _session
+    if CASSETTE_MODE not in ("record", "replay"):
+        return None
+    latency = CASSETTE_LATENCY
+    if latency != "recorded":
+        latency = float(latency) / 1000
+    path = os.path.join(CASSETTE_DIR, "{}.{}.json.gz".format(owner, name))
+    _cassette = Cassette(path, CASSETTE_MODE, latency)
+    _session = None
+    return _cassette
+
+
+def stop_cassette():
+    """
+    This function stops using the current cassette, saving it if it was being recorded.
+    """
+    global _cassette, _session
+    if _cassette is not None:
+        _cassette.save()
+    _cassette = None
+    _session = None
+
+
+def get_cassette():
+    """
+    :return: the cassette in use, or None
+    """
+    return _cassette
+
+
+def send_request(url: str, params: dict = None):
+    """
+    This function performs a GET request through the shared session.
+    Cached responses are revalidated with a conditional request, which GitHub does not
+    charge to the rate limit when the resource did not change.
+
+    :param url: the url to request
+    :param params: the query parameters of the request
+    :return: the response, or None if the request could not be completed
+    """
+    cache = get_http_cache()
+    entry = cache.get(url, params) if cache is not None else None
+    response = dispatch(
+        "GET",
+        url,
+        cached=cache is not None,
+        params=params,
+        headers=HTTPCache.conditional_headers(entry),
     )
+    if response is not None and cache is not None:
+        cache.revalidate(url, params, entry, response)
     return response
 
 
-def get_user_data_from_login(login: str):
+def dispatch(
+    method: str, url: str, resource: str = "core", cached: bool = False, **kwargs
+):
+    """
+    This function sends a request through the shared session, authenticated with the token
+    of the pool with the most requests left.
+    Requests are scheduled according to the rate limit of the token, and a request rejected
+    because of the rate limit is sent again, with another token if one is available.
+    Every request is recorded in the telemetry.
+
+    :param method: the HTTP method
+    :param url: the url to request
+    :param resource: the API resource whose rate limit is charged ("core" or "graphql")
+    :param cached: whether the response cache was consulted for the request
+    :param kwargs: the arguments of the request
+    :return: the response, or None if the request could not be completed
+    """
+    response = None
+    retries = 0
+    start = time.perf_counter()
+    pool = get_token_pool()
     try:
-        response = requests.get(
-            "https://api.github.com/users/" + login, auth=("YOSHI3", GIT_PAT)
+        for attempt in range(MAX_RATE_LIMIT_WAITS + 1):
+            token = pool.acquire(resource)
+            budget = pool.budget(token, resource)
+            rate_limiter.wait(budget)
+            auth = BearerAuth(token) if resource == "graphql" else ("YOSHI3", token)
+            session = get_session()
+            try:
+                with _request_slots:
+                    response = session.request(
+                        method, url, auth=auth, timeout=REQUEST_TIMEOUT, **kwargs
+                    )
+            except requests.exceptions.RequestException as e:
+                console.print("[bold red]There was an error with GitHub API: " + str(e))
+                response = None
+                return None
+            retries += attempt > 0
+            if response.raw is not None and response.raw.retries is not None:
+                retries += len(response.raw.retries.history)
+            rate_limiter.update(budget, response)
+            if not rate_limiter.is_rate_limited(response):
+                return response
+            console.print(
+                "[bold yellow]GitHub API rate limit reached, waiting for an available token"
+            )
+        return response
+    finally:
+        telemetry.record(
+            endpoint_template(method, url),
+            time.perf_counter() - start,
+            size=0 if response is None else len(response.content),
+            status=None if response is None else response.status_code,
+            retries=retries,
+            cache=None if not cached or response is None else cache_outcome(response),
         )
-        resp = json.loads(response.content)
-        return resp
-    except:
-        console.print("[bold red]There was an error with GitHub API. Please try again")
-        sys.exit(1)
-    return None
 
 
-def get_commit_by_sha(owner: str, name: str, sha: str):
-    try:
-        response = requests.get(
-            "https://api.github.com/repos/{}/{}/commits/{}".format(owner, name, sha),
-            auth=("YOSHI3", GIT_PAT),
+def cache_outcome(response):
+    """
+    :return: "hit" if the response was served by the cache after a conditional request, "miss" otherwise
+    """
+    return "hit" if response.status_code == 304 else "miss"
+
+
+def get_json(url: str, params: dict = None):
+    """
+    This function requests a single GitHub resource.
+
+    :param url: the url of the resource
+    :param params: the query parameters of the request
+    :return: the decoded resource, or None if it could not be retrieved
+    """
+    response = send_request(url, params)
+    if response is None:
+        return None
+    if not response.ok:
+        console.print(
+            "[bold red]GitHub API returned status {} for {}".format(
+                response.status_code, url
+            )
         )
-        resp = json.loads(response.content)
-        return resp
-    except:
-        console.print("[bold red]There was an error with GitHub API. Please try again")
-        sys.exit(1)
-    return None
+        return None
+    try:
+        return json.loads(response.content)
+    except ValueError:
+        console.print("[bold red]GitHub API returned an invalid response for " + url)
+        return None
 
 
-def get_pull_requests(owner: str, name: str):
-    response = paginate(
-        "https://api.github.com/repos/{}/{}/pulls?state=all".format(owner, name)
+def graphql(query: str, variables: dict = None):
+    """
+    This function performs a query to the GitHub GraphQL API.
+    Objects that cannot be resolved (e.g. unknown logins) are returned as None.
+
+    :param query: the GraphQL query
+    :param variables: the variables of the query
+    :return: the data of the response, or None if the query could not be completed
+    """
+    response = dispatch(
+        "POST",
+        GITHUB_API_URL + "/graphql",
+        "graphql",
+        json={"query": query, "variables": variables or {}},
     )
-    return response
+    if response is None or not response.ok:
+        console.print("[bold red]There was an error with GitHub GraphQL API")
+        return None
+    try:
+        payload = json.loads(response.content)
+    except ValueError:
+        console.print("[bold red]GitHub GraphQL API returned an invalid response")
+        return None
+    if payload.get("data") is None:
+        console.print(
+            "[bold red]There was an error with GitHub GraphQL API: "
+            + str(payload.get("errors"))
+        )
+        return None
+    return payload["data"]
 
 
-def get_pr_details(owner: str, name: str, pr_number: str):
-    try:
-        response = requests.get(
-            "https://api.github.com/repos/{}/{}/pulls/{}".format(
-                owner, name, pr_number
+PROFILE_FIELDS = """
+    __typename
+    login
+    ... on User {
+      databaseId
+      location
+      followers { totalCount }
+      following { totalCount }
+      repositories(privacy: PUBLIC, ownerAffiliations: [OWNER]) { totalCount }
+    }
+    ... on Organization {
+      databaseId
+      location
+      repositories(privacy: PUBLIC) { totalCount }
+    }
+"""
+
+
+def get_users_data_from_logins(logins: list):
+    """
+    This function retrieves the profiles of many users, looking up GRAPHQL_BATCH_SIZE logins per query.
+    Profiles have the same shape of the ones returned by get_user_data_from_login, limited to
+    login, id, type, location, follower/following/repository counts and urls.
+    Logins that GraphQL cannot resolve (e.g. bots) are looked up through the REST API.
+
+    :param logins: the logins of the users
+    :return: the profiles, in the same order as the logins (None if a user cannot be found)
+    """
+    profiles = []
+    for i in range(0, len(logins), GRAPHQL_BATCH_SIZE):
+        batch = logins[i : i + GRAPHQL_BATCH_SIZE]
+        query = "query({}) {{{}\n}}".format(
+            ", ".join("$l{}: String!".format(j) for j in range(len(batch))),
+            "".join(
+                "\n  u{0}: repositoryOwner(login: $l{0}) {{{1}}}".format(
+                    j, PROFILE_FIELDS
+                )
+                for j in range(len(batch))
             ),
-            auth=("YOSHI3", GIT_PAT),
         )
-        resp = json.loads(response.content)
-        return resp
-    except:
-        console.print("[bold red]There was an error with GitHub API. Please try again")
-        sys.exit(1)
-    return None
+        data = graphql(query, {"l{}".format(j): login for j, login in enumerate(batch)})
+        for j, login in enumerate(batch):
+            node = data.get("u{}".format(j)) if data is not None else None
+            if node is not None:
+                profiles.append(profile_from_node(node))
+            elif "@" in login:
+                profiles.append(None)
+            else:
+                profiles.append(get_user_data_from_login(login))
+    return profiles
+
 
+def profile_from_node(node: dict):
+    """
+    This function converts a GraphQL repository owner into a REST-like user profile.
+
+    :param node: the repository owner returned by GraphQL
+    :return: the user profile
+    """
+    login = node["login"]
+    user_url = "{}/users/{}".format(GITHUB_API_URL, login)
+    return {
+        "login": login,
+        "id": node.get("databaseId"),
+        "type": node["__typename"],
+        "location": node.get("location"),
+        "followers": node.get("followers", {}).get("totalCount", 0),
+        "following": node.get("following", {}).get("totalCount", 0),
+        "public_repos": node.get("repositories", {}).get("totalCount", 0),
+        "url": user_url,
+        "followers_url": user_url + "/followers",
+        "following_url": user_url + "/following{/other_user}",
+        "repos_url": user_url + "/repos",
+    }
+
+
+# connections of a repository owner listing its followers, following and owned public repositories,
+# ARGUMENTS is replaced by the pagination arguments
+CONNECTION_FIELDS = {
+    "followers": "... on User { followers(ARGUMENTS) {"
+    " pageInfo { hasNextPage endCursor } nodes { login } } }",
+    "following": "... on User { following(ARGUMENTS) {"
+    " pageInfo { hasNextPage endCursor } nodes { login } } }",
+    "repositories": "repositories(ARGUMENTS, privacy: PUBLIC,"
+    " ownerAffiliations: [OWNER], orderBy: {field: NAME, direction: ASC}) {"
+    " pageInfo { hasNextPage endCursor } nodes { name } }",
+}
+
+
+def get_users_connections(connections: dict):
+    """
+    This function retrieves the followers, following and owned public repositories of many users,
+    retrieving CONNECTIONS_BATCH_SIZE pages per query. The first page of every connection is
+    requested together; further pages are requested, by cursor, only for the connections having them.
+
+    :param connections: for each login, the connections to retrieve ("followers", "following"
+    or "repositories")
+    :return: for each login, the logins of the followers and following and the names of the
+    repositories in each connection requested; logins that could not be retrieved are omitted
+    """
+    results = {
+        login: {field: [] for field in fields} for login, fields in connections.items()
+    }
+    failed = set()
+    pending = [
+        (login, field, None) for login, fields in connections.items() for field in fields
+    ]
+    while pending:
+        batch = pending[:CONNECTIONS_BATCH_SIZE]
+        pending = pending[CONNECTIONS_BATCH_SIZE:]
+        variables = {}
+        declarations = []
+        selections = []
+        for j, (login, field, cursor) in enumerate(batch):
+            variables["l{}".format(j)] = login
+            declarations.append("$l{}: String!".format(j))
+            arguments = "first: {}".format(PAGE_SIZE)
+            if cursor is not None:
+                variables["c{}".format(j)] = cursor
+                declarations.append("$c{}: String".format(j))
+                arguments += ", after: $c{}".format(j)
+            selections.append(
+                "\n  p{0}: repositoryOwner(login: $l{0}) {{ {1} }}".format(
+                    j, CONNECTION_FIELDS[field].replace("ARGUMENTS", arguments)
+                )
+            )
+        query = "query({}) {{{}\n}}".format(
+            ", ".join(declarations), "".join(selections)
+        )
+        data = graphql(query, variables)
+        for j, (login, field, _) in enumerate(batch):
+            node = data.get("p{}".format(j)) if data is not None else None
+            if node is None:
+                failed.add(login)
+                continue
+            # organizations have no followers nor following
+            connection = node.get(field)
+            if connection is None:
+                continue
+            key = "name" if field == "repositories" else "login"
+            results[login][field].extend(
+                item[key] for item in connection["nodes"] if item is not None
+            )
+            if connection["pageInfo"]["hasNextPage"]:
+                pending.append((login, field, connection["pageInfo"]["endCursor"]))
+    return {login: result for login, result in results.items() if login not in failed}
+
+
+def get_commits_authors(owner: str, name: str, shas: list):
+    """
+    This function retrieves the GitHub login of the author of many commits,
+    looking up GRAPHQL_BATCH_SIZE commits per query.
+
+    :param owner: the owner of the repository
+    :param name: the name of the repository
+    :param shas: the SHAs of the commits
+    :return: a dictionary mapping the SHA of each commit found to the login of its author,
+    or None if the author is not associated with a GitHub user
+    """
+    authors = {}
+    for i in range(0, len(shas), GRAPHQL_BATCH_SIZE):
+        batch = shas[i : i + GRAPHQL_BATCH_SIZE]
+        commits = "".join(
+            "\n    c{0}: object(oid: $o{0}) {{ ... on Commit {{ author {{ user {{ login }} }} }} }}".format(
+                j
+            )
+            for j in range(len(batch))
+        )
+        query = (
+            "query($owner: String!, $name: String!, {}) {{\n"
+            "  repository(owner: $owner, name: $name) {{{}\n  }}\n}}"
+        ).format(
+            ", ".join("$o{}: GitObjectID!".format(j) for j in range(len(batch))),
+            commits,
+        )
+        variables = {"owner": owner, "name": name}
+        variables.update({"o{}".format(j): sha for j, sha in enumerate(batch)})
+        data = graphql(query, variables)
+        if data is None or data.get("repository") is None:
+            # fall back to the REST API for the whole batch
+            for sha in batch:
+                commit = get_commit_by_sha(owner, name, sha)
+                if commit is not None and "author" in commit.keys():
+                    author = commit["author"]
+                    authors[sha] = author.get("login") if author is not None else None
+            continue
+        for j, sha in enumerate(batch):
+            node = data["repository"].get("c{}".format(j))
+            if node is None or "author" not in node:
+                continue
+            user = node["author"]["user"] if node["author"] is not None else None
+            authors[sha] = user["login"] if user is not None else None
+    return authors
+
+
+def get_prs_merged_by(owner: str, name: str, numbers: list):
+    """
+    This function retrieves the login of the user who merged many pull requests,
+    looking up GRAPHQL_BATCH_SIZE pull requests per query.
+
+    :param owner: the owner of the repository
+    :param name: the name of the repository
+    :param numbers: the numbers of the pull requests
+    :return: a dictionary mapping the number of each pull request found to the login of the
+    user who merged it, or None if it was not merged or the user no longer exists
+    """
+    merged_by = {}
+    for i in range(0, len(numbers), GRAPHQL_BATCH_SIZE):
+        batch = numbers[i : i + GRAPHQL_BATCH_SIZE]
+        prs = "".join(
+            "\n    p{0}: pullRequest(number: $n{0}) {{ mergedBy {{ login }} }}".format(j)
+            for j in range(len(batch))
+        )
+        query = (
+            "query($owner: String!, $name: String!, {}) {{\n"
+            "  repository(owner: $owner, name: $name) {{{}\n  }}\n}}"
+        ).format(", ".join("$n{}: Int!".format(j) for j in range(len(batch))), prs)
+        variables = {"owner": owner, "name": name}
+        variables.update({"n{}".format(j): number for j, number in enumerate(batch)})
+        data = graphql(query, variables)
+        if data is None or data.get("repository") is None:
+            # fall back to the REST API for the whole batch
+            for number in batch:
+                pr = get_pr_details(owner, name, number)
+                if pr is not None and "merged_by" in pr.keys():
+                    user = pr["merged_by"]
+                    merged_by[number] = user.get("login") if user is not None else None
+            continue
+        for j, number in enumerate(batch):
+            node = data["repository"].get("p{}".format(j))
+            if node is None:
+                continue
+            user = node["mergedBy"]
+            merged_by[number] = user["login"] if user is not None else None
+    return merged_by
 
-def get_prs_comments(owner: str, name: str, since: str):
+
+def get_milestones(owner: str, name: str):
     response = paginate(
-        "https://api.github.com/repos/{}/{}/pulls/comments?since={}".format(
-            owner, name, since
+        "{0}/repos/{1}/{2}/milestones?state=all&per_page=100".format(
+            GITHUB_API_URL, owner, name
         )
     )
     return response
 
 
-def get_commits_comments(owner: str, name: str):
-    response = paginate(
-        "https://api.github.com/repos/{}/{}/comments".format(owner, name)
+def has_milestones(owner: str, name: str):
+    """
+    This function checks if a repository has at least one milestone, open or closed,
+    requesting a single milestone.
+
+    :param owner: the owner of the repository
+    :param name: the name of the repository
+    :return: true if the repository has milestones
+    :raises GitHubAPIError: if the milestones cannot be retrieved
+    """
+    url = "{}/repos/{}/{}/milestones".format(GITHUB_API_URL, owner, name)
+    milestones = get_json(url, {"state": "all", "per_page": 1})
+    if milestones is None:
+        raise GitHubAPIError("Could not retrieve " + url)
+    return len(milestones) > 0
+
+
+def get_user_data_from_login(login: str):
+    return get_json("{}/users/{}".format(GITHUB_API_URL, login))
+
+
+def is_following(login: str, other_login: str):
+    """
+    This function checks if a user follows another one.
+
+    :param login: the login of the user
+    :param other_login: the login of the other user
+    :return: true if the user follows the other one, false otherwise (or if it cannot be checked)
+    """
+    response = send_request(
+        "{}/users/{}/following/{}".format(GITHUB_API_URL, login, other_login)
     )
+    if response is None or response.status_code not in (204, 404):
+        console.print(
+            "[bold red]Could not check if {} follows {}".format(login, other_login)
+        )
+        return False
+    return response.status_code == 204
+
+
+def get_commit_by_sha(owner: str, name: str, sha: str):
+    return get_json(
+        "{}/repos/{}/{}/commits/{}".format(GITHUB_API_URL, owner, name, sha)
+    )
+
+
+def get_pull_requests(
+    owner: str, name: str, updated_since: str = None, stream: bool = False, stop=None
+):
+    """
+    This function retrieves the pull requests of a repository, from the most recent one.
+
+    :param owner: the owner of the repository
+    :param name: the name of the repository
+    :param updated_since: optional GitHub date (YYYY-MM-DDTHH:MM:SSZ); if given, pull requests are
+    retrieved from the most recently updated and the retrieval stops at the first one updated before it
+    :param stream: if true, pull requests are yielded as the pages are retrieved
+    :param stop: optional predicate ending the retrieval at the first pull request satisfying it
+    :return: the pull requests
+    """
+    url = "{}/repos/{}/{}/pulls?state=all".format(GITHUB_API_URL, owner, name)
+    if updated_since is not None:
+        url += "&sort=updated&direction=desc"
+        stop = updated_before(updated_since, stop)
+    response = collect(url, stream, stop)
     return response
 
 
-def get_watchers(owner: str, name: str):
-    response = paginate(
-        "https://api.github.com/repos/{}/{}/subscribers".format(owner, name)
+def updated_before(date: str, stop=None):
+    """
+    :return: a stop predicate satisfied by items updated before the given GitHub date, or by `stop`
+    """
+
+    def predicate(item):
+        return item["updated_at"] < date or (stop is not None and stop(item))
+
+    return predicate
+
+
+def created_before(date: str, stop=None):
+    """
+    :return: a stop predicate satisfied by items created before the given GitHub date, or by `stop`
+    """
+
+    def predicate(item):
+        return item["created_at"] < date or (stop is not None and stop(item))
+
+    return predicate
+
+
+def get_pr_details(owner: str, name: str, pr_number: str):
+    return get_json(
+        "{}/repos/{}/{}/pulls/{}".format(GITHUB_API_URL, owner, name, pr_number)
+    )
+
+
+def get_prs_comments(
+    owner: str, name: str, since: str, stream: bool = False, stop=None
+):
+    response = collect(
+        "{}/repos/{}/{}/pulls/comments?since={}".format(
+            GITHUB_API_URL, owner, name, since
+        ),
+        stream,
+        stop,
     )
     return response
 
 
-def get_stargazers(owner: str, name: str):
-    response = paginate(
-        "https://api.github.com/repos/{}/{}/stargazers".format(owner, name)
+def get_commits_comments(
+    owner: str, name: str, since: str = None, stream: bool = False, stop=None
+):
+    """
+    This function retrieves the commit comments of a repository, which GitHub lists oldest first.
+
+    :param owner: the owner of the repository
+    :param name: the name of the repository
+    :param since: optional GitHub date (YYYY-MM-DDTHH:MM:SSZ); if given, the pages are walked
+    backwards from the last one, from the most recent comment, and the retrieval stops at the
+    first comment created before it
+    :param stream: if true, comments are yielded as the pages are retrieved
+    :param stop: optional predicate ending the retrieval at the first comment satisfying it
+    :return: the comments
+    """
+    url = "{}/repos/{}/{}/comments".format(GITHUB_API_URL, owner, name)
+    if since is None:
+        return collect(url, stream, stop)
+    return collect(url, stream, created_before(since, stop), reverse=True)
+
+
+def get_watchers(owner: str, name: str, stream: bool = False, stop=None):
+    response = collect(
+        "{}/repos/{}/{}/subscribers".format(GITHUB_API_URL, owner, name), stream, stop
+    )
+    return response
+
+
+def get_stargazers(owner: str, name: str, stream: bool = False, stop=None):
+    response = collect(
+        "{}/repos/{}/{}/stargazers".format(GITHUB_API_URL, owner, name), stream, stop
     )
     return response
 
@@ -111,26 +729,213 @@ def make_request(url: str):
     return response
 
 
+def collect(url: str, stream: bool = False, stop=None, reverse: bool = False):
+    """
+    This function retrieves the items of a paginated GitHub resource.
+
+    :param url: the url of the first page
+    :param stream: if true, the items are yielded as the pages are retrieved instead of being returned in a list
+    :param stop: optional predicate on items ending the retrieval at the first item satisfying it
+    :param reverse: if true, the items are retrieved from the last page backwards
+    :return: the items (a generator if streaming, a list otherwise)
+    """
+    items = iter_paginate(url, stop, reverse)
+    return items if stream else list(items)
+
+
 def paginate(url):
-    remaining_pages = True
-    data = []
-    while remaining_pages:
+    """
+    This function retrieves all the pages of a GitHub resource.
+
+    :param url: the url of the first page
+    :return: the items of all the pages, in page order
+    :raises GitHubAPIError: if a page cannot be retrieved
+    """
+    return list(iter_paginate(url))
+
+
+def iter_paginate(url: str, stop=None, reverse: bool = False):
+    """
+    This function yields the items of a GitHub resource page by page, as they are retrieved.
+    When the first page links to the last one, up to PAGE_WORKERS of the following pages are
+    retrieved concurrently ahead of the consumer, otherwise the "next" links are followed one
+    page at a time. Pages added after the link to the last page was read are then reached
+    through the "next" links of the last page, as in the sequential walk.
+
+    :param url: the url of the first page
+    :param stop: optional predicate on items; the iteration ends at the first item satisfying it,
+    which is not yielded
+    :param reverse: if true, the items are yielded in reverse order, walking the pages backwards
+    from the last one; useful for resources listed oldest first, when only the recent items are needed
+    :return: a generator of the items, in page order (or in reverse order)
+    :raises GitHubAPIError: if a page cannot be retrieved
+    """
+    page, response = fetch_page(url)
+    urls = None
+    if "last" in response.links:
+        urls = page_urls(response.links["last"]["url"])
+    if reverse:
+        pages = backward_pages(page, response, urls)
+    else:
+        pages = forward_pages(page, response, urls)
+    try:
+        for page in pages:
+            for item in page:
+                if stop is not None and stop(item):
+                    return
+                yield item
+    finally:
+        pages.close()
+
+
+def forward_pages(page: list, response, urls: list = None):
+    """
+    This function yields the first page and the ones following it, in order.
+    """
+    yield page
+    if urls:
+        for page, response in prefetch_pages(urls):
+            yield page
+    yield from follow_next_pages(page, response)
+
+
+def backward_pages(page: list, response, urls: list = None):
+    """
+    This function yields the pages from the last one to the first one, each with its items reversed.
+    The linked last page is retrieved first, and the pages added after it (e.g. if the link came
+    from the cache) are walked forward from it before going backwards.
+    """
+    if urls:
+        last, last_response = fetch_page(urls[-1])
+        for following in reversed(list(follow_next_pages(last, last_response))):
+            yield following[::-1]
+        yield last[::-1]
+        for previous, _ in prefetch_pages(urls[-2::-1]):
+            yield previous[::-1]
+    elif next_page_url(page, response) is not None:
+        # without a link to the last page, the pages can only be walked forward
+        for previous in reversed(list(follow_next_pages(page, response))):
+            yield previous[::-1]
+    yield page[::-1]
+
+
+def follow_next_pages(page: list, response):
+    """
+    This function yields the pages following a page, one at a time, see next_page_url.
+    """
+    url = next_page_url(page, response)
+    while url is not None:
+        page, response = fetch_page(url)
+        yield page
+        url = next_page_url(page, response)
+
+
+def next_page_url(page: list, response):
+    """
+    This function finds the page following a page through its "next" link.
+    A Link header restored from the cache (see HTTPCache.revalidate) may predate the pages
+    added since, so it is not trusted to end the pagination: a full page whose links are
+    stale is followed by the next page number.
+
+    :param page: the items of the page
+    :param response: the response of the page
+    :return: the url of the following page, or None if the page is the last one
+    """
+    if "next" in response.links:
+        return response.links["next"]["url"]
+    if getattr(response, "stale_links", False) and len(page) >= PAGE_SIZE:
+        query = parse_qs(urlparse(response.url).query)
         try:
-            response = requests.get(
-                url,
-                params={"per_page": 100},
-                auth=("YOSHI3", GIT_PAT),
-            )
+            number = int(query.get("page", ["1"])[-1])
+        except ValueError:
+            return None
+        return page_url(response.url, number + 1)
+    return None
 
-            for el in json.loads(response.content):
-                data.append(el)
-            remaining_pages = "next" in response.links
 
-            if remaining_pages:
-                url = response.links["next"]["url"]
-        except:
-            console.print(
-                "[bold red]There was an error with GitHub API. Please try again"
+def prefetch_pages(urls: list):
+    """
+    This function yields the pages at the given urls in order, together with their responses,
+    keeping up to PAGE_WORKERS requests in flight ahead of the consumer (one at a time within
+    sequential_pages).
+    """
+    if getattr(_local, "sequential", False):
+        for url in urls:
+            yield fetch_page(url)
+        return
+    urls = iter(urls)
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        futures = deque(
+            executor.submit(fetch_page, url) for url in itertools.islice(urls, PAGE_WORKERS)
+        )
+        try:
+            while futures:
+                page, response = futures.popleft().result()
+                url = next(urls, None)
+                if url is not None:
+                    futures.append(executor.submit(fetch_page, url))
+                yield page, response
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+@contextmanager
+def sequential_pages():
+    """
+    Within this context, the pages requested by the current thread are retrieved one at a time
+    instead of being prefetched concurrently, so that each paginated request keeps a single
+    request in flight (as needed by callers bounding their own concurrency).
+    """
+    previous = getattr(_local, "sequential", False)
+    _local.sequential = True
+    try:
+        yield
+    finally:
+        _local.sequential = previous
+
+
+def fetch_page(url: str):
+    """
+    This function retrieves a single page of a GitHub resource.
+
+    :param url: the url of the page
+    :return: the items of the page and the response
+    :raises GitHubAPIError: if the page cannot be retrieved
+    """
+    response = send_request(url, {"per_page": PAGE_SIZE})
+    if response is None or not response.ok:
+        raise GitHubAPIError(
+            "Could not retrieve {} ({})".format(
+                url, "no response" if response is None else response.status_code
             )
-            sys.exit(1)
-    return data
+        )
+    try:
+        return json.loads(response.content), response
+    except ValueError:
+        raise GitHubAPIError("Invalid response for " + url)
+
+
+def page_urls(last_url: str):
+    """
+    This function builds the urls of the pages following the first one, given the url of the last page.
+
+    :param last_url: the url of the last page, as found in the Link header
+    :return: the urls of pages 2 to last, or None if the page number cannot be read
+    """
+    query = parse_qs(urlparse(last_url).query)
+    try:
+        last = int(query["page"][-1])
+    except (KeyError, ValueError):
+        return None
+    return [page_url(last_url, number) for number in range(2, last + 1)]
+
+
+def page_url(url: str, number: int):
+    """
+    :return: the url of a page of the resource requested by a url
+    """
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    query["page"] = [str(number)]
+    return urlunparse(parsed._replace(query=urlencode(query, doseq=True)))
@@ -0,0 +1,169 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from io_module import api_manager
+
+# maximum number of requests in flight, overall and towards a single host
+MAX_CONCURRENCY = 32
+PER_HOST_CONCURRENCY = 16
+
+"""
+This module contains an asyncio client exposing the same endpoints of api_manager.
+Requests run on a dedicated thread pool through the shared session of api_manager, so they keep
+its connection pooling, retries, rate limiting and caching. Paginated requests retrieve their
+pages one at a time, so that the limits of the client bound the requests in flight.
+"""
+
+
+class AsyncGitHubClient:
+    """
+    This class runs requests to the GitHub APIs concurrently, bounding the requests in flight
+    with a global semaphore and a semaphore per host.
+    It must be created and used within a running event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        per_host_concurrency: int = PER_HOST_CONCURRENCY,
+    ):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.per_host_concurrency = per_host_concurrency
+        self.host_semaphores = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    def host_semaphore(self, url: str):
+        host = urlparse(url).netloc
+        if host not in self.host_semaphores:
+            self.host_semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self.host_semaphores[host]
+
+    async def call(self, url: str, function, *args):
+        """
+        This function runs a request function of api_manager once a slot is free.
+
+        :param url: the url requested, used to select the host semaphore
+        :param function: the api_manager function performing the request
+        :param args: the arguments of the function
+        :return: the result of the function
+        """
+        async with self.semaphore, self.host_semaphore(url):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, run_sequentially, function, *args
+            )
+
+    async def get_milestones(self, owner: str, name: str):
+        return await self.call(
+            api_manager.GITHUB_API_URL, api_manager.get_milestones, owner, name
+        )
+
+    async def get_user_data_from_login(self, login: str):
+        return await self.call(
+            api_manager.GITHUB_API_URL, api_manager.get_user_data_from_login, login
+        )
+
+    async def get_users_data_from_logins(self, logins: list):
+        return await self.call(
+            api_manager.GITHUB_API_URL, api_manager.get_users_data_from_logins, logins
+        )
+
+    async def is_following(self, login: str, other_login: str):
+        return await self.call(
+            api_manager.GITHUB_API_URL, api_manager.is_following, login, other_login
+        )
+
+    async def get_users_connections(self, connections: dict):
+        return await self.call(
+            api_manager.GITHUB_API_URL, api_manager.get_users_connections, connections
+        )
+
+    async def get_commit_by_sha(self, owner: str, name: str, sha: str):
+        return await self.call(
+            api_manager.GITHUB_API_URL, api_manager.get_commit_by_sha, owner, name, sha
+        )
+
+    async def get_commits_authors(self, owner: str, name: str, shas: list):
+        return await self.call(
+            api_manager.GITHUB_API_URL,
+            api_manager.get_commits_authors,
+            owner,
+            name,
+            shas,
+        )
+
+    async def get_pull_requests(
+        self, owner: str, name: str, updated_since: str = None
+    ):
+        return await self.call(
+            api_manager.GITHUB_API_URL,
+            api_manager.get_pull_requests,
+            owner,
+            name,
+            updated_since,
+        )
+
+    async def get_prs_merged_by(self, owner: str, name: str, numbers: list):
+        return await self.call(
+            api_manager.GITHUB_API_URL,
+            api_manager.get_prs_merged_by,
+            owner,
+            name,
+            numbers,
+        )
+
+    async def get_pr_details(self, owner: str, name: str, pr_number: str):
+        return await self.call(
+            api_manager.GITHUB_API_URL,
+            api_manager.get_pr_details,
+            owner,
+            name,
+            pr_number,
+        )
+
+    async def get_prs_comments(self, owner: str, name: str, since: str):
+        return await self.call(
+            api_manager.GITHUB_API_URL, api_manager.get_prs_comments, owner, name, since
+        )
+
+    async def get_commits_comments(self, owner: str, name: str, since: str = None):
+        return await self.call(
+            api_manager.GITHUB_API_URL,
+            api_manager.get_commits_comments,
+            owner,
+            name,
+            since,
+        )
+
+    async def get_watchers(self, owner: str, name: str):
+        return await self.call(
+            api_manager.GITHUB_API_URL, api_manager.get_watchers, owner, name
+        )
+
+    async def get_stargazers(self, owner: str, name: str):
+        return await self.call(
+            api_manager.GITHUB_API_URL, api_manager.get_stargazers, owner, name
+        )
+
+    async def make_request(self, url: str):
+        return await self.call(url, api_manager.make_request, url)
+
+    async def graphql(self, query: str, variables: dict = None):
+        return await self.call(
+            api_manager.GITHUB_API_URL, api_manager.graphql, query, variables
+        )
+
+
+def run_sequentially(function, *args):
+    # pages are not prefetched by threads of their own, which the semaphores would not bound
+    with api_manager.sequential_pages():
+        return function(*args)
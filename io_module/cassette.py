@@ -0,0 +1,165 @@
+import gzip
+import json
+import os
+import threading
+import time
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+
+"""
+This module records the responses received from the network into cassettes, and serves them
+back so that an analysis can be repeated offline and deterministically
+"""
+
+# response headers kept in the cassette, the others are dropped to keep it compact
+RECORDED_HEADERS = (
+    "Content-Type",
+    "ETag",
+    "Last-Modified",
+    "Link",
+    "Retry-After",
+    "X-RateLimit-Limit",
+    "X-RateLimit-Remaining",
+    "X-RateLimit-Reset",
+)
+
+
+class CassetteMiss(Exception):
+    """
+    Raised in replay mode when a request was not recorded in the cassette.
+    """
+
+
+class Cassette:
+    """
+    This class stores the interactions of an analysis in a gzipped JSON file.
+    Interactions are keyed by request; a request sent several times is answered with the
+    recorded responses in order, the last one being repeated once they are exhausted.
+    """
+
+    def __init__(self, path: str, mode: str, latency=None):
+        """
+        :param path: the path of the cassette file
+        :param mode: "record" to capture the interactions, "replay" to serve them back
+        :param latency: in replay mode, seconds waited before each answer, or "recorded" to
+        wait as long as the recorded interaction took (None to answer immediately)
+        """
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.interactions = {}
+        self.positions = {}
+        if mode == "replay":
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                self.interactions = json.load(f)
+
+    @staticmethod
+    def key(method: str, url: str, body=None):
+        """
+        :return: the key identifying a request in the cassette
+        """
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        if body is None:
+            return "{} {}".format(method, url)
+        return "{} {} {}".format(method, url, body)
+
+    def record(self, key: str, interaction: dict):
+        """
+        This function appends an interaction to those recorded for a request.
+
+        :param key: the key of the request
+        :param interaction: a JSON serializable description of the answer
+        """
+        with self.lock:
+            self.interactions.setdefault(key, []).append(interaction)
+
+    def play(self, key: str):
+        """
+        This function returns the next recorded interaction of a request, after waiting for
+        the injected latency.
+
+        :param key: the key of the request
+        :return: the interaction
+        :raises CassetteMiss: if the request was not recorded
+        """
+        with self.lock:
+            recorded = self.interactions.get(key)
+            if not recorded:
+                raise CassetteMiss(key)
+            position = self.positions.get(key, 0)
+            self.positions[key] = position + 1
+            interaction = recorded[min(position, len(recorded) - 1)]
+        if self.latency == "recorded":
+            time.sleep(interaction.get("elapsed", 0))
+        elif self.latency:
+            time.sleep(self.latency)
+        return interaction
+
+    def save(self):
+        """
+        This function writes the recorded interactions to the cassette file.
+        """
+        if self.mode != "record":
+            return
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self.lock:
+            with gzip.open(self.path, "wt", encoding="utf-8") as f:
+                json.dump(self.interactions, f, separators=(",", ":"))
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    This transport adapter records the responses received through another adapter, or answers
+    the requests with the responses recorded in a cassette.
+    """
+
+    def __init__(self, cassette: Cassette, adapter: BaseAdapter = None):
+        """
+        :param cassette: the cassette
+        :param adapter: the adapter sending the requests in record mode
+        """
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request, **kwargs):
+        key = Cassette.key(request.method, request.url, request.body)
+        if self.cassette.mode == "record":
+            start = time.perf_counter()
+            response = self.adapter.send(request, **kwargs)
+            self.cassette.record(
+                key,
+                {
+                    "status": response.status_code,
+                    "headers": {
+                        header: response.headers[header]
+                        for header in RECORDED_HEADERS
+                        if header in response.headers
+                    },
+                    "body": response.content.decode("latin-1"),
+                    "elapsed": round(time.perf_counter() - start, 4),
+                },
+            )
+            return response
+        try:
+            interaction = self.cassette.play(key)
+        except CassetteMiss:
+            raise ConnectionError("Request not recorded in the cassette: " + key)
+        response = Response()
+        response.status_code = interaction["status"]
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response._content = interaction["body"].encode("latin-1")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        if self.adapter is not None:
+            self.adapter.close()
@@ -0,0 +1,174 @@
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlencode
+
+"""
+This module contains a persistent cache of GitHub responses, used to send conditional requests
+"""
+
+
+@dataclass
+class CacheEntry:
+    """
+    This class stores a cached response body together with its validators
+    """
+
+    body: bytes
+    etag: str = None
+    last_modified: str = None
+    link: str = None
+
+
+class HTTPCache:
+    """
+    This class stores response bodies on disk, keyed by url and query parameters, together with
+    their ETag and Last-Modified validators. Entries are evicted in least recently used order
+    once the total size of the stored bodies exceeds the configured cap.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        :param path: the path of the SQLite database storing the cache
+        :param max_bytes: the maximum total size of the stored bodies
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, body BLOB, etag TEXT, last_modified TEXT, "
+            "link TEXT, size INTEGER, last_access REAL)"
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def key(url: str, params: dict = None):
+        if not params:
+            return url
+        return url + "#" + urlencode(sorted(params.items()))
+
+    def get(self, url: str, params: dict = None):
+        """
+        :return: the cached entry of the request, or None if not cached
+        """
+        key = self.key(url, params)
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT body, etag, last_modified, link FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self.connection.commit()
+        return CacheEntry(*row)
+
+    def store(self, url: str, params: dict, response):
+        """
+        This function stores a successful response, if it carries a validator.
+
+        :param url: the requested url
+        :param params: the query parameters of the request
+        :param response: the response received
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag is None and last_modified is None:
+            return
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.key(url, params),
+                    body,
+                    etag,
+                    last_modified,
+                    response.headers.get("Link"),
+                    len(body),
+                    time.time(),
+                ),
+            )
+            self.evict()
+            self.connection.commit()
+
+    def evict(self):
+        """
+        This function removes the least recently used entries until the cache fits its size cap.
+        """
+        total = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        while total > self.max_bytes:
+            key, size = self.connection.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def revalidate(self, url: str, params: dict, entry: CacheEntry, response):
+        """
+        This function completes a conditional request: a 304 response is filled with the cached body,
+        while a new successful response replaces the cached entry.
+        The Link header of a 304 response is kept, and stored in place of the cached one; the
+        cached Link is restored only if the 304 response carries none, in which case it may
+        predate pages added since: response.stale_links is then set.
+
+        :param url: the requested url
+        :param params: the query parameters of the request
+        :param entry: the cached entry sent as conditional request, or None
+        :param response: the response received
+        """
+        if response.status_code == 304 and entry is not None:
+            response.status_code = 200
+            response._content = entry.body
+            link = response.headers.get("Link")
+            if link is None and entry.link is not None:
+                response.headers["Link"] = entry.link
+            response.from_cache = True
+            response.stale_links = link is None
+            with self.lock:
+                self.hits += 1
+                if link is not None and link != entry.link:
+                    self.connection.execute(
+                        "UPDATE responses SET link = ? WHERE key = ?",
+                        (link, self.key(url, params)),
+                    )
+                    self.connection.commit()
+        elif response.status_code == 200:
+            with self.lock:
+                self.misses += 1
+            self.store(url, params, response)
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry):
+        """
+        :return: the headers turning a request for a cached entry into a conditional request
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
@@ -35,6 +35,21 @@ def save_results(output_path, community, community_patterns):
         json.dump(community.metrics.__dict__, f)
 
 
+def save_telemetry(community, telemetry):
+    """
+    This function writes the per-endpoint telemetry of the requests sent for a community
+    next to its metrics.
+
+    :param community: the analyzed community
+    :param telemetry: the telemetry summary
+    """
+    data_path = os.path.join("data", community.repo_owner, community.repo_name)
+    if not os.path.exists(data_path):
+        os.makedirs(data_path)
+    with open(os.path.join(data_path, "telemetry.json"), "w") as f:
+        json.dump(telemetry, f, indent=2)
+
+
 def print_graph(G, community):
     graphs = [G.subgraph(c).copy() for c in nx.connected_components(G)]
     for i in range(len(graphs)):
@@ -0,0 +1,164 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+"""
+This module keeps track of the GitHub API rate limit of each token and schedules the requests accordingly
+"""
+
+
+@dataclass
+class TokenBudget:
+    """
+    This class stores the rate limit state of a token, as reported by the last GitHub response
+    """
+
+    limit: int = None
+    remaining: int = None
+    # epoch seconds
+    reset: float = None
+
+
+class RateLimiter:
+    """
+    This class paces the requests sent with each token so that its budget lasts until the reset,
+    waits for the reset when the budget is exhausted, and honours the Retry-After header of the
+    secondary rate limits. It also counts the requests charged to each stage of the analysis.
+    """
+
+    def __init__(self, pacing_threshold: float = 0.1, clock=time.time, sleep=time.sleep):
+        """
+        :param pacing_threshold: fraction of the budget under which requests start to be spread until the reset
+        :param clock: function returning the current epoch time
+        :param sleep: function used to wait
+        """
+        self.pacing_threshold = pacing_threshold
+        self.clock = clock
+        self.sleep = sleep
+        self.budgets = {}
+        self.blocked_until = {}
+        self.last_request = {}
+        self.current_stage = "other"
+        self.usage = {}
+        self.lock = threading.Lock()
+
+    def wait(self, token: str):
+        """
+        This function blocks until a request can be sent with the given token.
+
+        :param token: the token that will authenticate the request
+        """
+        with self.lock:
+            now = self.clock()
+            not_before = self.blocked_until.get(token, 0)
+            budget = self.budgets.get(token)
+            if budget is not None and budget.reset is not None and budget.reset > now:
+                if budget.remaining <= 0:
+                    not_before = max(not_before, budget.reset + 1)
+                elif budget.remaining <= budget.limit * self.pacing_threshold:
+                    interval = (budget.reset - now) / budget.remaining
+                    not_before = max(
+                        not_before, self.last_request.get(token, 0) + interval
+                    )
+                # reserve the request, so that concurrent callers see the reduced budget
+                budget.remaining -= 1
+            start = max(now, not_before)
+            self.last_request[token] = start
+        if start > now:
+            self.sleep(start - now)
+
+    def update(self, token: str, response):
+        """
+        This function updates the budget of a token from the headers of a GitHub response.
+
+        :param token: the token that authenticated the request
+        :param response: the response received
+        """
+        headers = response.headers
+        with self.lock:
+            if response.status_code != 304:
+                self.usage[self.current_stage] = (
+                    self.usage.get(self.current_stage, 0) + 1
+                )
+            if "X-RateLimit-Remaining" in headers:
+                try:
+                    self.budgets[token] = TokenBudget(
+                        limit=int(headers.get("X-RateLimit-Limit", 0)),
+                        remaining=int(headers["X-RateLimit-Remaining"]),
+                        reset=float(headers.get("X-RateLimit-Reset", 0)),
+                    )
+                except ValueError:
+                    pass
+            if self.is_rate_limited(response) and "Retry-After" in headers:
+                try:
+                    retry_after = float(headers["Retry-After"])
+                except ValueError:
+                    retry_after = 60
+                self.blocked_until[token] = self.clock() + retry_after
+
+    def is_rate_limited(self, response):
+        """
+        This function checks if a response was rejected because of a primary or secondary rate limit.
+
+        :param response: the response received
+        :return: true if the request should be sent again once the limit is over
+        """
+        if response.status_code not in (403, 429):
+            return False
+        return (
+            "Retry-After" in response.headers
+            or response.headers.get("X-RateLimit-Remaining") == "0"
+        )
+
+    def remaining(self, token: str):
+        """
+        :param token: a token
+        :return: the number of requests left to the token, or None if unknown
+        """
+        budget = self.budgets.get(token)
+        if budget is None or budget.reset is None or budget.reset <= self.clock():
+            return None
+        return budget.remaining
+
+    def available_at(self, token: str):
+        """
+        :param token: a token
+        :return: the epoch time from which the token can be used again, 0 if it can be used now
+        """
+        with self.lock:
+            available = self.blocked_until.get(token, 0)
+            budget = self.budgets.get(token)
+            if (
+                budget is not None
+                and budget.reset is not None
+                and budget.remaining <= 0
+                and budget.reset > self.clock()
+            ):
+                available = max(available, budget.reset + 1)
+        return available if available > self.clock() else 0
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Context manager charging the requests sent within it to the given stage.
+
+        :param name: the name of the stage
+        """
+        previous = self.current_stage
+        self.current_stage = name
+        try:
+            yield
+        finally:
+            self.current_stage = previous
+
+    def report(self):
+        """
+        :return: the number of requests charged to each stage
+        """
+        with self.lock:
+            return dict(self.usage)
+
+    def reset_usage(self):
+        with self.lock:
+            self.usage = {}
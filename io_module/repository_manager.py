@@ -1,35 +1,296 @@
 import os
+import subprocess
 import git  
+from datetime import datetime, timedelta
 from os import path
+from dotenv import load_dotenv
 from console import console
+from community import commit
+from io_module.activity_index import ActivityIndex
 
-def download_repo(repo_owner:str, repo_name:str):
+load_dotenv(".env")
+
+# "full" clones every object, "blobless" leaves file contents on the server and "treeless" also
+# the directories, both without checking out a working tree: TOAD only reads commit metadata and
+# the names of the modified files, which blobless clones answer locally (treeless ones fetch
+# the trees they miss on demand, one commit at a time when the activity index is first built)
+CLONE_MODE = os.environ.get("CLONE_MODE", "blobless").lower()
+CLONE_FILTERS = {"blobless": "blob:none", "treeless": "tree:0"}
+# if true, only the history from the start of the analysis window is cloned; the lifetime of the
+# community (formality metric) is then computed from the first cloned commit
+CLONE_SHALLOW = os.environ.get("CLONE_SHALLOW", "false").lower() == "true"
+# directory of the indexes of the commit activity of the repositories, see update_activity_index
+ACTIVITY_INDEX_DIR = os.environ.get(
+    "ACTIVITY_INDEX_DIR", os.path.join("cache", "activity")
+)
+# the data of a commit read by git log, see parse_commit
+COMMIT_FORMAT = "%H%x00%ae%x00%at%x00%ad%x00%ce%x00%ct%x00%cd"
+
+def download_repo(repo_owner:str, repo_name:str, since: datetime = None, update: bool = True):
     """
-    This function pulls the whole repository specified with name and owner, and stores it locally.
+    This function clones the repository specified with name and owner, and stores it locally.
+    A repository cloned before is updated with an incremental fetch.
 
+    :param since: if given, the history is cloned only from this date (see CLONE_SHALLOW)
+    :param update: if false, a repository cloned before is used as it is
     :return: the repository ad a git Repo object
     """ 
-    # build path
-    repo_path = os.path.join(
-        "repositories",
-        "{}.{}".format(repo_owner, repo_name),
-    )
+    repo_path = repository_path(repo_owner, repo_name)
 
     # get repository reference
     repo = None
     if not os.path.exists(repo_path):
         console.print("[bold magenta]Downloading repository...")
+        options = {}
+        if CLONE_MODE in CLONE_FILTERS:
+            options["filter"] = CLONE_FILTERS[CLONE_MODE]
+            options["no_checkout"] = True
+        if since is not None:
+            options["shallow_since"] = shallow_date(since)
         repo = git.Repo.clone_from(
             "https://github.com/"+repo_owner+"/"+repo_name,
             repo_path,
             progress=Progress(),
             odbt=git.GitCmdObjectDB,
+            **options,
         )
+        if since is not None:
+            deepen(repo)
     else:
-        repo = git.Repo(repo_path, odbt=git.GitCmdObjectDB)
+        repo = open_repo(repo_owner, repo_name)
+        if update:
+            update_repo(repo, since)
     return repo
 
 
+def repository_path(repo_owner: str, repo_name: str):
+    return os.path.join(
+        "repositories",
+        "{}.{}".format(repo_owner, repo_name),
+    )
+
+
+def open_repo(repo_owner: str, repo_name: str):
+    """
+    :return: the repository cloned before, as a git Repo object
+    """
+    return git.Repo(repository_path(repo_owner, repo_name), odbt=git.GitCmdObjectDB)
+
+
+def update_repo(repo: git.Repo, since: datetime = None):
+    """
+    This function fetches the commits pushed since the repository was cloned, and moves the
+    current branch to the fetched one, without touching the working tree.
+    If the repository cannot be fetched (e.g. offline), it is used as it is.
+
+    :param repo: the repository
+    :param since: if given, the history is kept only from this date
+    """
+    console.print("[bold magenta]Updating repository...")
+    try:
+        if since is not None:
+            repo.git.fetch("origin", shallow_since=shallow_date(since))
+            deepen(repo)
+        else:
+            repo.git.fetch("origin")
+        tracking = repo.head.reference.tracking_branch()
+        if tracking is not None:
+            repo.git.reset("--soft", tracking.path)
+    except (git.GitCommandError, TypeError) as e:
+        console.print("[bold yellow]Could not update the repository: " + str(e))
+
+
+def shallow_date(since: datetime):
+    # a day earlier, so that time zones cannot leave out commits of the first day
+    return (since - timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def deepen(repo: git.Repo):
+    """
+    This function adds the parents of the oldest commits of a shallow clone, so that the files
+    modified by those commits are compared with their parents instead of being listed in full.
+    """
+    repo.git.fetch("origin", deepen=1)
+
+
+def clone_filter(repo: git.Repo):
+    """
+    :return: the filter the repository was cloned with (see CLONE_FILTERS), None if it is not
+    a partial clone
+    """
+    try:
+        return repo.git.config("--get", "remote.origin.partialclonefilter")
+    except git.GitCommandError:
+        return None
+
+
+def count_commits(repo: git.Repo):
+    """
+    :return: the number of commits of the history, counted without reading their contents
+    """
+    return int(repo.git.rev_list("--count", "HEAD"))
+
+
+def iter_window_commits(repo: git.Repo, start_date: datetime):
+    """
+    This function reads the commits that may fall within a time window, newest first, without
+    parsing the rest of the history. Commits are selected by committer date from the day before
+    the start of the window, leaving the exact selection to filters.filter_commits; no upper bound
+    is set, since commits authored within the window may have been committed after it.
+    Each commit is checked on its own (--since-as-filter), since --since stops the walk at the
+    first few older commits, leaving out the commits behind them (e.g. with skewed dates).
+    All the data needed about a commit is read by a single git log pass.
+
+    :param repo: the repository
+    :param start_date: the start of the time window
+    :return: a generator of the commits, as commit.Commit records
+    """
+    for line in log_lines(
+        repo,
+        "--since-as-filter="
+        + (start_date - timedelta(days=1)).strftime("%Y-%m-%d"),
+        "--date=format:%z",
+        "--format=" + COMMIT_FORMAT,
+    ):
+        yield parse_commit(line)
+
+
+def iter_commit_activity(repo: git.Repo, since: str = None):
+    """
+    This function reads the commits of the history, newest first, together with the files they
+    modified, with a single git log pass instead of one git diff per commit. Files are compared
+    with the first parent of each commit (or listed in full for root commits), without rename
+    detection, as in Commit.stats. Only the names of the files are listed, so that their
+    contents are not needed (and not downloaded in blobless clones).
+
+    :param repo: the repository
+    :param since: if given, only the commits that are not ancestors of this SHA are read
+    :return: a generator of (commit.Commit, modified files) pairs
+    """
+    current = None
+    files = {}
+    for line in log_lines(
+        repo,
+        "--name-only",
+        "--no-renames",
+        "--diff-merges=first-parent",
+        "--date=format:%z",
+        "--format=%x00" + COMMIT_FORMAT,
+        "HEAD" if since is None else since + "..HEAD",
+    ):
+        if line.startswith("\0"):
+            if current is not None:
+                yield current, list(files)
+            current = parse_commit(line[1:])
+            files = {}
+        elif line:
+            files[line] = None
+    if current is not None:
+        yield current, list(files)
+
+
+def parse_commit(line: str):
+    """
+    :param line: a commit formatted by git log with COMMIT_FORMAT and --date=format:%z
+    :return: the commit, as a commit.Commit record
+    """
+    (
+        sha,
+        author,
+        authored_date,
+        author_tz_offset,
+        committer,
+        committed_date,
+        committer_tz_offset,
+    ) = line.split("\0")
+    authored_date = int(authored_date)
+    committed_date = int(committed_date)
+    # most commits are committed when authored, and can share the same date object
+    if committed_date == authored_date:
+        committed_date = authored_date
+    return commit.Commit(
+        sha,
+        commit.actor_id(author),
+        commit.actor_id(committer),
+        authored_date,
+        committed_date,
+        commit.parse_tz_offset(author_tz_offset),
+        commit.parse_tz_offset(committer_tz_offset),
+    )
+
+
+def activity_index_path(repo_owner: str, repo_name: str):
+    return os.path.join(
+        ACTIVITY_INDEX_DIR, "{}.{}.sqlite".format(repo_owner, repo_name)
+    )
+
+
+def open_activity_index(repo_owner: str, repo_name: str):
+    return ActivityIndex(activity_index_path(repo_owner, repo_name))
+
+
+def update_activity_index(repo: git.Repo, repo_owner: str, repo_name: str):
+    """
+    This function extends the activity index of a repository with the commits added since it
+    was last updated. The index is built again if the history was rewritten meanwhile.
+
+    :param repo: the repository
+    :return: the activity index
+    """
+    index = open_activity_index(repo_owner, repo_name)
+    head = repo.head.commit.hexsha
+    indexed = index.head()
+    if indexed == head:
+        return index
+    if indexed is not None:
+        try:
+            rewritten = not repo.is_ancestor(indexed, head)
+        except git.GitCommandError:
+            rewritten = True
+        if rewritten:
+            index.clear()
+            indexed = None
+    if indexed is None and clone_filter(repo) == CLONE_FILTERS["treeless"]:
+        # the files modified by each commit are listed from its trees, which treeless clones
+        # fetch one commit at a time
+        console.print(
+            "[bold yellow]Treeless clone: indexing the whole history fetches the trees of "
+            "every commit, clone with CLONE_MODE=blobless to avoid it"
+        )
+    console.print("[bold magenta]Indexing commit activity...")
+    index.add(iter_commit_activity(repo, indexed), head)
+    return index
+
+
+def log_lines(repo: git.Repo, *options: str):
+    """
+    This function streams the output of git log, one line per commit.
+
+    :param repo: the repository
+    :param options: the options of git log, including the format of the lines
+    :return: a generator of the lines, without the line terminator
+    """
+    process = subprocess.Popen(
+        [repo.git.GIT_PYTHON_GIT_EXECUTABLE or "git", "log", "--no-color", *options],
+        cwd=repo.working_dir,
+        stdout=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="surrogateescape",
+    )
+    completed = False
+    try:
+        for line in process.stdout:
+            yield line.rstrip("\n")
+        completed = True
+    finally:
+        process.stdout.close()
+        # if the lines are not all read, git is stopped rather than left writing to the pipe
+        if not completed:
+            process.kill()
+        if process.wait() != 0 and completed:
+            raise git.GitCommandError("git log", process.returncode)
+
 
 class Progress(git.remote.RemoteProgress):
     def update(self, op_code, cur_count, max_count=None, message=""):
@@ -0,0 +1,137 @@
+import math
+import re
+import threading
+from urllib.parse import urlparse
+
+"""
+This module collects per-endpoint measurements of the HTTP requests sent during an analysis
+"""
+
+# path segments replaced by a placeholder when building the endpoint template
+SHA_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+NUMBER_PATTERN = re.compile(r"^\d+$")
+
+
+def endpoint_template(method: str, url: str):
+    """
+    This function builds the template of the endpoint requested by a url, replacing owners,
+    repositories, logins, numbers and commit hashes with placeholders, e.g.
+    GET /repos/{owner}/{repo}/pulls/{number}. The query string is dropped.
+
+    :param method: the HTTP method
+    :param url: the requested url
+    :return: the endpoint template
+    """
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    template = []
+    for i, segment in enumerate(segments):
+        previous = template[i - 1] if i > 0 else None
+        if previous == "repos" and i == 1:
+            segment = "{owner}"
+        elif previous == "{owner}" and i == 2:
+            segment = "{repo}"
+        elif previous in ("users", "following", "followers") and i % 2 == 1:
+            segment = "{login}"
+        elif SHA_PATTERN.match(segment):
+            segment = "{sha}"
+        elif NUMBER_PATTERN.match(segment):
+            segment = "{number}"
+        template.append(segment)
+    return "{} /{}".format(method, "/".join(template))
+
+
+def percentile(values: list, fraction: float):
+    """
+    :param values: the sorted values
+    :param fraction: the percentile, between 0 and 1
+    :return: the nearest-rank percentile of the values
+    """
+    if not values:
+        return None
+    rank = max(1, math.ceil(fraction * len(values)))
+    return values[rank - 1]
+
+
+class Telemetry:
+    """
+    This class records, for each request, its endpoint template, latency, size, status,
+    retries and cache outcome, and aggregates them per endpoint.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(
+        self,
+        endpoint: str,
+        latency: float,
+        size: int = 0,
+        status: int = None,
+        retries: int = 0,
+        cache: str = None,
+    ):
+        """
+        This function records a request.
+
+        :param endpoint: the endpoint template, see endpoint_template
+        :param latency: the seconds spent on the request, retries included
+        :param size: the bytes of the response body
+        :param status: the status code of the response, None if no response was received
+        :param retries: how many times the request was sent again
+        :param cache: "hit" or "miss" if the response cache was consulted, None otherwise
+        """
+        with self.lock:
+            stats = self.endpoints.setdefault(
+                endpoint,
+                {
+                    "latencies": [],
+                    "bytes": 0,
+                    "retries": 0,
+                    "statuses": {},
+                    "cache": {"hit": 0, "miss": 0},
+                },
+            )
+            stats["latencies"].append(latency)
+            stats["bytes"] += size
+            stats["retries"] += retries
+            status = "error" if status is None else str(status)
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+            if cache is not None:
+                stats["cache"][cache] += 1
+
+    def summary(self):
+        """
+        :return: for each endpoint, the number of requests, the bytes received, the retries,
+        the status codes, the cache outcomes and the latency percentiles (in seconds),
+        sorted by total latency
+        """
+        with self.lock:
+            endpoints = {
+                endpoint: dict(stats, latencies=sorted(stats["latencies"]))
+                for endpoint, stats in self.endpoints.items()
+            }
+        summary = {}
+        for endpoint, stats in sorted(
+            endpoints.items(), key=lambda item: -sum(item[1]["latencies"])
+        ):
+            latencies = stats["latencies"]
+            summary[endpoint] = {
+                "requests": len(latencies),
+                "bytes": stats["bytes"],
+                "retries": stats["retries"],
+                "statuses": dict(stats["statuses"]),
+                "cache": dict(stats["cache"]),
+                "latency": {
+                    "total": round(sum(latencies), 3),
+                    "p50": round(percentile(latencies, 0.5), 3),
+                    "p90": round(percentile(latencies, 0.9), 3),
+                    "p99": round(percentile(latencies, 0.99), 3),
+                    "max": round(latencies[-1], 3),
+                },
+            }
+        return summary
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote, urlencode
+
+
+class GitHubStub:
+    """
+    Local stand-in for the GitHub API used by the tests.
+
+    Routes map a path to a function receiving the query parameters, the request headers and the
+    decoded JSON body, and returning a (status, headers, body) tuple; the body is encoded as JSON.
+    Every request received is stored in `requests` as (method, path, query, headers, body).
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def _handle(self, method):
+                parsed = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length)) if length else None
+                stub.requests.append(
+                    (method, parsed.path, query, dict(self.headers), body)
+                )
+                route = stub.routes.get(unquote(parsed.path))
+                if route is None:
+                    status, headers, payload = 404, {}, {"message": "Not Found"}
+                else:
+                    status, headers, payload = route(query, self.headers, body)
+                content = b"" if payload is None else json.dumps(payload).encode()
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:{}".format(self.server.server_port)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def paged(
+        self,
+        path: str,
+        items: list,
+        per_page: int = 100,
+        headers=None,
+        etags: bool = False,
+        links_on_304: bool = True,
+    ):
+        """
+        Registers a route serving `items` split in pages, with GitHub-style Link headers.
+        `items` can also be a function receiving the query parameters and returning the items;
+        the links keep the query parameters of the request.
+        With `etags`, pages carry an ETag derived from their body and requests whose
+        If-None-Match matches it are answered 304, with the Link header only if `links_on_304`.
+        """
+
+        def route(query, request_headers, body):
+            page = int(query.get("page", 1))
+            size = int(query.get("per_page", per_page))
+            served = items(query) if callable(items) else items
+            last = max(1, -(-len(served) // size))
+            params = {k: v for k, v in query.items() if k != "page"}
+
+            def link(number, rel):
+                query_string = urlencode({**params, "page": number})
+                url = "{}{}?{}".format(self.url, path, query_string)
+                return '<{}>; rel="{}"'.format(url, rel)
+
+            links = []
+            if page < last:
+                links.append(link(page + 1, "next"))
+                links.append(link(last, "last"))
+            response_headers = dict(headers or {})
+            if links:
+                response_headers["Link"] = ", ".join(links)
+            content = served[(page - 1) * size : page * size]
+            if etags:
+                digest = hashlib.sha1(json.dumps(content).encode()).hexdigest()
+                etag = '"{}"'.format(digest)
+                response_headers["ETag"] = etag
+                if request_headers.get("If-None-Match") == etag:
+                    if not links_on_304:
+                        response_headers.pop("Link", None)
+                    return 304, response_headers, None
+            return 200, response_headers, content
+
+        self.routes[path] = route
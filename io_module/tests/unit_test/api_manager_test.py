@@ -0,0 +1,404 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from io_module import api_manager
+from io_module.tests.github_stub import GitHubStub
+
+
+@pytest.fixture(autouse=True)
+def fresh_session(fresh_session, monkeypatch):
+    """
+    Every test gets its own session and cache, without waiting between retries.
+    """
+    monkeypatch.setattr(api_manager, "BACKOFF_FACTOR", 0)
+
+
+def test_paginate_follows_next_links():
+    """
+    All the pages are retrieved and returned in order.
+    """
+    items = [{"id": i} for i in range(250)]
+    with GitHubStub() as stub:
+        stub.paged("/items", items)
+        assert api_manager.paginate(stub.url + "/items") == items
+
+
+def test_get_json_retries_server_errors():
+    """
+    A transient 5xx response is retried on the shared session.
+    """
+    calls = []
+
+    def flaky(query, headers, body):
+        calls.append(1)
+        if len(calls) < 3:
+            return 502, {}, {"message": "Bad Gateway"}
+        return 200, {}, {"login": "octocat"}
+
+    with GitHubStub() as stub:
+        stub.routes["/users/octocat"] = flaky
+        assert api_manager.get_json(stub.url + "/users/octocat") == {"login": "octocat"}
+    assert len(calls) == 3
+
+
+def test_get_json_returns_none_on_failure():
+    """
+    A request that keeps failing is reported to the caller instead of terminating the process.
+    """
+    with GitHubStub() as stub:
+        assert api_manager.get_json(stub.url + "/users/ghost") is None
+
+
+def test_paginate_raises_on_failure():
+    """
+    A page that cannot be retrieved raises GitHubAPIError.
+    """
+    with GitHubStub() as stub:
+        with pytest.raises(api_manager.GitHubAPIError):
+            api_manager.paginate(stub.url + "/missing")
+
+
+def test_paginate_fetches_remaining_pages_concurrently():
+    """
+    When the last page is known, every page is requested once and items keep the page order.
+    """
+    items = [{"id": i} for i in range(1234)]
+    with GitHubStub() as stub:
+        stub.paged("/stargazers", items)
+        assert api_manager.paginate(stub.url + "/stargazers") == items
+        pages = sorted(int(query.get("page", 1)) for _, _, query, _, _ in stub.requests)
+    assert pages == list(range(1, 14))
+
+
+def test_paginate_without_last_link_follows_next_links():
+    """
+    Without a "last" link the pages are followed sequentially.
+    """
+    items = [{"id": i} for i in range(250)]
+    with GitHubStub() as stub:
+        stub.paged("/followers", items)
+        route = stub.routes["/followers"]
+
+        def without_last(query, headers, body):
+            status, response_headers, page = route(query, headers, body)
+            if "Link" in response_headers:
+                response_headers["Link"] = response_headers["Link"].split(", ")[0]
+            return status, response_headers, page
+
+        stub.routes["/followers"] = without_last
+        assert api_manager.paginate(stub.url + "/followers") == items
+
+
+def test_paginate_reaches_pages_added_while_paging():
+    """
+    Items added after the first page was retrieved are reached through the "next" link of the
+    last prefetched page, as the sequential walk does.
+    """
+    items = [{"id": i} for i in range(450)]
+    served = []
+
+    def growing(query):
+        # the first page is served before the last 200 items are added
+        served.append(query.get("page", "1"))
+        return items[:250] if len(served) == 1 else items
+
+    with GitHubStub() as stub:
+        stub.paged("/stargazers", growing)
+        assert api_manager.paginate(stub.url + "/stargazers") == items
+
+
+def test_requests_in_flight_bounded_by_pool(monkeypatch):
+    """
+    Pages prefetched by several threads at once never exceed the connections of the pool.
+    """
+    monkeypatch.setattr(api_manager, "POOL_SIZE", 2)
+    items = [{"id": i} for i in range(1000)]
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+    with GitHubStub() as stub:
+        stub.paged("/stargazers", items)
+        route = stub.routes["/stargazers"]
+
+        def slow(query, headers, body):
+            with lock:
+                in_flight.append(None)
+                peak.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.pop()
+            return route(query, headers, body)
+
+        stub.routes["/stargazers"] = slow
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(api_manager.paginate, [stub.url + "/stargazers"] * 4)
+            )
+    assert results == [items] * 4
+    assert max(peak) <= 2
+
+
+def owners_route(owners: dict):
+    """
+    Stub GraphQL endpoint resolving every `uN: repositoryOwner(login: $lN)` alias from `owners`.
+    """
+
+    def route(query, headers, body):
+        data = {}
+        for name, login in body["variables"].items():
+            data["u" + name[1:]] = owners.get(login)
+        return 200, {}, {"data": data}
+
+    return route
+
+
+def test_get_users_data_from_logins_batches_queries(monkeypatch):
+    """
+    Profiles are looked up GRAPHQL_BATCH_SIZE logins at a time and keep the order of the logins.
+    """
+    monkeypatch.setattr(api_manager, "GRAPHQL_BATCH_SIZE", 2)
+    owners = {
+        "alice": {
+            "__typename": "User",
+            "login": "alice",
+            "databaseId": 1,
+            "location": "Salerno",
+            "followers": {"totalCount": 3},
+            "following": {"totalCount": 4},
+            "repositories": {"totalCount": 5},
+        },
+        "acme": {
+            "__typename": "Organization",
+            "login": "acme",
+            "databaseId": 2,
+            "location": None,
+            "repositories": {"totalCount": 7},
+        },
+    }
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        stub.routes["/graphql"] = owners_route(owners)
+        stub.routes["/users/bot[bot]"] = lambda q, h, b: (
+            200,
+            {},
+            {"login": "bot[bot]", "type": "Bot"},
+        )
+        profiles = api_manager.get_users_data_from_logins(
+            ["alice", "someone@example.com", "acme", "bot[bot]"]
+        )
+        graphql_calls = [r for r in stub.requests if r[1] == "/graphql"]
+
+    assert len(graphql_calls) == 2
+    assert graphql_calls[0][3]["Authorization"].startswith("bearer ")
+    alice, unknown, acme, bot = profiles
+    assert alice["type"] == "User"
+    assert alice["location"] == "Salerno"
+    assert (alice["followers"], alice["following"], alice["public_repos"]) == (3, 4, 5)
+    assert alice["followers_url"] == stub.url + "/users/alice/followers"
+    assert alice["following_url"].split("{")[0] == stub.url + "/users/alice/following"
+    assert unknown is None
+    assert acme["type"] == "Organization"
+    assert bot == {"login": "bot[bot]", "type": "Bot"}
+
+
+def test_get_commits_authors_batches_queries(monkeypatch):
+    """
+    Commit authors are resolved GRAPHQL_BATCH_SIZE commits at a time; unknown commits are left out.
+    """
+    monkeypatch.setattr(api_manager, "GRAPHQL_BATCH_SIZE", 2)
+    commits = {
+        "a1": {"author": {"user": {"login": "alice"}}},
+        "b2": {"author": {"user": None}},
+    }
+
+    def route(query, headers, body):
+        variables = body["variables"]
+        repository = {
+            "c" + key[1:]: commits.get(sha)
+            for key, sha in variables.items()
+            if key.startswith("o")
+        }
+        return 200, {}, {"data": {"repository": repository}}
+
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        stub.routes["/graphql"] = route
+        authors = api_manager.get_commits_authors("owner", "name", ["a1", "b2", "c3"])
+        assert len(stub.requests) == 2
+    assert authors == {"a1": "alice", "b2": None}
+
+
+def test_get_prs_merged_by_batches_queries(monkeypatch):
+    """
+    Pull requests are looked up GRAPHQL_BATCH_SIZE at a time; unknown pull requests are left out.
+    """
+    monkeypatch.setattr(api_manager, "GRAPHQL_BATCH_SIZE", 2)
+    prs = {1: {"mergedBy": {"login": "alice"}}, 2: {"mergedBy": None}}
+
+    def route(query, headers, body):
+        variables = body["variables"]
+        repository = {
+            "p" + key[1:]: prs.get(number)
+            for key, number in variables.items()
+            if key.startswith("n")
+        }
+        return 200, {}, {"data": {"repository": repository}}
+
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        stub.routes["/graphql"] = route
+        merged_by = api_manager.get_prs_merged_by("owner", "name", [1, 2, 3])
+        assert len(stub.requests) == 2
+    assert merged_by == {1: "alice", 2: None}
+
+
+@pytest.mark.parametrize("with_last", [True, False])
+def test_iter_paginate_stops_early(monkeypatch, with_last):
+    """
+    Streaming ends at the first item satisfying the stop predicate, without downloading every page.
+    """
+    monkeypatch.setattr(api_manager, "PAGE_WORKERS", 2)
+    items = [{"id": i} for i in range(1000)]
+    with GitHubStub() as stub:
+        stub.paged("/pulls", items)
+        if not with_last:
+            route = stub.routes["/pulls"]
+
+            def without_last(query, headers, body):
+                status, response_headers, page = route(query, headers, body)
+                if "Link" in response_headers:
+                    response_headers["Link"] = response_headers["Link"].split(", ")[0]
+                return status, response_headers, page
+
+            stub.routes["/pulls"] = without_last
+        streamed = api_manager.iter_paginate(
+            stub.url + "/pulls", stop=lambda item: item["id"] == 250
+        )
+        assert list(streamed) == items[:250]
+        assert len(stub.requests) <= 5
+
+
+@pytest.mark.parametrize("with_last", [True, False])
+def test_iter_paginate_reverse(monkeypatch, with_last):
+    """
+    Walking backwards yields the items from the last one and stops without the earlier pages.
+    """
+    monkeypatch.setattr(api_manager, "PAGE_WORKERS", 2)
+    items = [{"id": i} for i in range(1000)]
+    with GitHubStub() as stub:
+        stub.paged("/comments", items)
+        if not with_last:
+            route = stub.routes["/comments"]
+
+            def without_last(query, headers, body):
+                status, response_headers, page = route(query, headers, body)
+                if "Link" in response_headers:
+                    response_headers["Link"] = response_headers["Link"].split(", ")[0]
+                return status, response_headers, page
+
+            stub.routes["/comments"] = without_last
+        everything = list(
+            api_manager.iter_paginate(stub.url + "/comments", reverse=True)
+        )
+        stub.requests.clear()
+        streamed = api_manager.iter_paginate(
+            stub.url + "/comments", stop=lambda item: item["id"] < 850, reverse=True
+        )
+        assert list(streamed) == items[:849:-1]
+        if with_last:
+            assert len(stub.requests) <= 5
+    assert everything == items[::-1]
+
+
+def test_commits_comments_since(monkeypatch):
+    comments = [
+        {"id": i, "created_at": "2023-01-{:02d}T10:00:00Z".format(i)}
+        for i in range(1, 31)
+    ]
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        stub.paged("/repos/owner/repo/comments", comments, per_page=5)
+        recent = api_manager.get_commits_comments(
+            "owner", "repo", since="2023-01-20T00:00:00Z"
+        )
+    assert [comment["id"] for comment in recent] == list(range(30, 19, -1))
+
+
+def connections_route(owners: dict):
+    """
+    Stand-in for the GraphQL API answering the connection queries of get_users_connections,
+    with the cursor being the offset of the page.
+    """
+    pattern = re.compile(
+        r"p(\d+): repositoryOwner\(login: \$l\d+\) \{ (?:\.\.\. on User \{ )?(\w+)\(first: (\d+)"
+    )
+
+    def route(query, headers, body):
+        variables = body["variables"]
+        data = {}
+        for alias, field, size in pattern.findall(body["query"]):
+            owner = owners.get(variables["l" + alias])
+            if owner is None:
+                data["p" + alias] = None
+                continue
+            if field not in owner:
+                data["p" + alias] = {}
+                continue
+            offset = int(variables.get("c" + alias) or 0)
+            end = offset + int(size)
+            key = "name" if field == "repositories" else "login"
+            data["p" + alias] = {
+                field: {
+                    "pageInfo": {
+                        "hasNextPage": end < len(owner[field]),
+                        "endCursor": str(end),
+                    },
+                    "nodes": [{key: item} for item in owner[field][offset:end]],
+                }
+            }
+        return 200, {}, {"data": data}
+
+    return route
+
+
+def test_get_users_connections_paginates_by_cursor(monkeypatch):
+    """
+    The first pages of all connections are requested together, the following ones only
+    for the connections having them.
+    """
+    monkeypatch.setattr(api_manager, "CONNECTIONS_BATCH_SIZE", 4)
+    owners = {
+        "alice": {
+            "followers": ["user{}".format(i) for i in range(250)],
+            "following": ["bob"],
+            "repositories": ["toad"],
+        },
+        "bob": {"followers": ["alice"], "following": [], "repositories": []},
+        "acme": {"repositories": ["repo{}".format(i) for i in range(120)]},
+    }
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        stub.routes["/graphql"] = connections_route(owners)
+        connections = api_manager.get_users_connections(
+            {
+                "alice": ["repositories", "followers", "following"],
+                "bob": ["repositories", "followers"],
+                "acme": ["repositories", "followers", "following"],
+                "ghost": ["repositories"],
+            }
+        )
+        # 9 first pages and 3 further pages, 4 per query, the third page of alice's
+        # followers being known only once the second one is retrieved
+        assert len(stub.requests) == 4
+
+    assert connections == {
+        "alice": owners["alice"],
+        "bob": {"followers": ["alice"], "repositories": []},
+        "acme": {
+            "followers": [],
+            "following": [],
+            "repositories": owners["acme"]["repositories"],
+        },
+    }
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+from io_module import api_manager
+from io_module.async_api_manager import AsyncGitHubClient
+from io_module.tests.github_stub import GitHubStub
+
+
+def test_client_bounds_requests_in_flight():
+    """
+    No more requests than the global limit run at the same time.
+    """
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def request(i):
+        with lock:
+            in_flight.append(i)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.remove(i)
+        return i
+
+    async def run():
+        async with AsyncGitHubClient(max_concurrency=3, per_host_concurrency=2) as client:
+            first = [client.call("https://a.example", request, i) for i in range(10)]
+            second = [client.call("https://b.example", request, i) for i in range(10, 20)]
+            return await asyncio.gather(*first, *second)
+
+    assert asyncio.run(run()) == list(range(20))
+    assert max(peak) <= 3
+
+
+def test_client_bounds_paginated_requests_in_flight(monkeypatch, fresh_session):
+    """
+    The pages of paginated requests count towards the limits of the client.
+    """
+    items = [{"id": i} for i in range(1000)]
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    with GitHubStub() as stub:
+        stub.paged("/stargazers", items)
+        route = stub.routes["/stargazers"]
+
+        def slow(query, headers, body):
+            with lock:
+                in_flight.append(None)
+                peak.append(len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.pop()
+            return route(query, headers, body)
+
+        stub.routes["/stargazers"] = slow
+
+        async def run():
+            async with AsyncGitHubClient(
+                max_concurrency=2, per_host_concurrency=2
+            ) as client:
+                return await asyncio.gather(
+                    *[client.make_request(stub.url + "/stargazers") for _ in range(4)]
+                )
+
+        assert asyncio.run(run()) == [items] * 4
+    assert max(peak) <= 2
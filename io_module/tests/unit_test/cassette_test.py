@@ -0,0 +1,53 @@
+import pytest
+from io_module import api_manager
+from io_module.tests.github_stub import GitHubStub
+
+
+@pytest.fixture(autouse=True)
+def fresh_session(fresh_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(api_manager, "CASSETTE_DIR", str(tmp_path / "cassettes"))
+    monkeypatch.setattr(api_manager, "BACKOFF_FACTOR", 0)
+
+
+def retrieve(url):
+    return (
+        api_manager.paginate(url + "/repos/owner/repo/stargazers"),
+        api_manager.get_json(url + "/users/octocat"),
+        api_manager.graphql("query { viewer { login } }"),
+    )
+
+
+def test_replay_serves_recorded_responses(monkeypatch):
+    """
+    Responses recorded in a cassette are served back without reaching the network.
+    """
+    with GitHubStub() as stub:
+        monkeypatch.setattr(api_manager, "GITHUB_API_URL", stub.url)
+        stub.paged("/repos/owner/repo/stargazers", [{"id": i} for i in range(250)])
+        stub.routes["/users/octocat"] = lambda q, h, b: (200, {}, {"login": "octocat"})
+        stub.routes["/graphql"] = lambda q, h, b: (
+            200,
+            {},
+            {"data": {"viewer": {"login": "octocat"}}},
+        )
+        monkeypatch.setattr(api_manager, "CASSETTE_MODE", "record")
+        api_manager.start_cassette("owner", "repo")
+        recorded = retrieve(stub.url)
+        api_manager.stop_cassette()
+        requests_sent = len(stub.requests)
+
+        monkeypatch.setattr(api_manager, "CASSETTE_MODE", "replay")
+        api_manager.start_cassette("owner", "repo")
+        replayed = retrieve(stub.url)
+        missing = api_manager.get_json(stub.url + "/users/ghost")
+        api_manager.stop_cassette()
+        assert len(stub.requests) == requests_sent
+
+    assert replayed == recorded
+    assert missing is None
+
+
+def test_replay_without_cassette_fails(monkeypatch):
+    monkeypatch.setattr(api_manager, "CASSETTE_MODE", "replay")
+    with pytest.raises(FileNotFoundError):
+        api_manager.start_cassette("owner", "missing")
@@ -0,0 +1,90 @@
+import pytest
+from io_module import api_manager
+from io_module.http_cache import HTTPCache
+from io_module.tests.github_stub import GitHubStub
+
+
+class FakeResponse:
+    def __init__(self, body, headers):
+        self.status_code = 200
+        self.content = body
+        self.headers = headers
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HTTPCache(str(tmp_path / "cache.sqlite"), max_bytes=10)
+
+
+def test_stores_only_responses_with_validators(cache):
+    cache.store("u1", None, FakeResponse(b"abc", {"ETag": '"1"'}))
+    cache.store("u2", None, FakeResponse(b"abc", {}))
+    assert cache.get("u1").etag == '"1"'
+    assert cache.get("u2") is None
+
+
+def test_key_includes_parameters(cache):
+    cache.store("u", {"page": 2}, FakeResponse(b"abc", {"ETag": '"2"'}))
+    assert cache.get("u", {"page": 2}).body == b"abc"
+    assert cache.get("u", {"page": 3}) is None
+
+
+def test_evicts_least_recently_used(cache):
+    cache.store("a", None, FakeResponse(b"1234", {"ETag": "a"}))
+    cache.store("b", None, FakeResponse(b"1234", {"ETag": "b"}))
+    cache.get("a")
+    cache.store("c", None, FakeResponse(b"1234", {"ETag": "c"}))
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_conditional_request_served_from_cache(monkeypatch, fresh_session):
+    """
+    The second request is sent with If-None-Match and the 304 answer is filled with the cached body.
+    """
+
+    def user(query, headers, body):
+        if headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, None
+        return 200, {"ETag": '"v1"'}, {"login": "octocat"}
+
+    with GitHubStub() as stub:
+        stub.routes["/users/octocat"] = user
+        first = api_manager.get_json(stub.url + "/users/octocat")
+        second = api_manager.get_json(stub.url + "/users/octocat")
+        sent = [headers.get("If-None-Match") for _, _, _, headers, _ in stub.requests]
+    assert first == second == {"login": "octocat"}
+    assert sent == [None, '"v1"']
+    assert api_manager.get_http_cache().stats() == {"hits": 1, "misses": 1}
+
+
+@pytest.mark.parametrize("links_on_304", [True, False])
+def test_pagination_reaches_items_added_between_runs(
+    monkeypatch, fresh_session, links_on_304
+):
+    """
+    A list grows between two runs while its first pages are unchanged: the pages answered 304
+    do not end the pagination at the last page of the first run, walking forward or backward.
+    """
+    items = [{"id": i} for i in range(450)]
+    size = [250]
+
+    with GitHubStub() as stub:
+        stub.paged(
+            "/stargazers",
+            lambda query: items[: size[0]],
+            etags=True,
+            links_on_304=links_on_304,
+        )
+        url = stub.url + "/stargazers"
+        assert api_manager.paginate(url) == items[:250]
+        size[0] = 450
+        assert api_manager.paginate(url) == items
+        assert list(api_manager.iter_paginate(url, reverse=True)) == items[::-1]
+        # the full list of the first run is cached as well
+        size[0] = 300
+        api_manager.paginate(url)
+        size[0] = 450
+        assert list(api_manager.iter_paginate(url, reverse=True)) == items[::-1]
+    assert api_manager.get_http_cache().stats()["hits"] > 0
@@ -0,0 +1,99 @@
+import time
+import pytest
+from io_module import api_manager
+from io_module.rate_limiter import RateLimiter
+from io_module.tests.github_stub import GitHubStub
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return RateLimiter(clock=clock.time, sleep=clock.sleep)
+
+
+def rate_headers(remaining, reset, limit=5000):
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(reset),
+    }
+
+
+def test_no_wait_with_plenty_of_budget(limiter, clock):
+    limiter.update("t", FakeResponse(200, rate_headers(4000, clock.now + 3600)))
+    limiter.wait("t")
+    assert clock.sleeps == []
+
+
+def test_waits_for_reset_when_budget_is_exhausted(limiter, clock):
+    limiter.update("t", FakeResponse(200, rate_headers(0, clock.now + 120)))
+    limiter.wait("t")
+    assert clock.sleeps == [121]
+
+
+def test_paces_requests_when_budget_is_low(limiter, clock):
+    limiter.update("t", FakeResponse(200, rate_headers(10, clock.now + 100)))
+    limiter.wait("t")
+    limiter.wait("t")
+    # 9 requests left over 100 seconds once the first one is sent
+    assert clock.sleeps == [pytest.approx(100 / 9)]
+
+
+def test_honours_retry_after(limiter, clock):
+    response = FakeResponse(403, {"Retry-After": "30"})
+    limiter.update("t", response)
+    assert limiter.is_rate_limited(response)
+    limiter.wait("t")
+    assert clock.sleeps == [30]
+
+
+def test_budget_used_per_stage(limiter, clock):
+    with limiter.stage("structure"):
+        limiter.update("t", FakeResponse(200, {}))
+        limiter.update("t", FakeResponse(304, {}))
+    limiter.update("t", FakeResponse(200, {}))
+    assert limiter.report() == {"structure": 1, "other": 1}
+
+
+def test_send_request_waits_instead_of_failing(monkeypatch, clock, fresh_session):
+    """
+    A request rejected by the rate limit of the stand-in server is sent again after the reset.
+    """
+    limiter = RateLimiter(sleep=clock.sleep)
+    monkeypatch.setattr(api_manager, "rate_limiter", limiter)
+    calls = []
+
+    def limited(query, headers, body):
+        calls.append(1)
+        if len(calls) == 1:
+            return 403, rate_headers(0, int(time.time()) + 5), {"message": "rate limited"}
+        return 200, rate_headers(4999, int(time.time()) + 3600), {"login": "octocat"}
+
+    with GitHubStub() as stub:
+        stub.routes["/users/octocat"] = limited
+        assert api_manager.get_json(stub.url + "/users/octocat") == {"login": "octocat"}
+    assert len(calls) == 2
+    assert len(clock.sleeps) == 1 and 4 <= clock.sleeps[0] <= 7
@@ -0,0 +1,231 @@
+import git
+from datetime import datetime
+from community.community import Community
+from community.data import Data
+from data_retriever import filters
+from io_module import activity_index, repository_manager
+
+
+def commit_files(repo, files: dict, message: str):
+    for name, content in files.items():
+        path = repo.working_dir + "/" + name
+        if content is None:
+            repo.index.remove([name], working_tree=True)
+            continue
+        with open(path, "wb") as f:
+            f.write(content)
+        repo.index.add([name])
+    return repo.index.commit(message)
+
+
+def test_iter_commit_activity_matches_commit_stats(tmp_path):
+    """
+    The single git log pass lists the same files as Commit.stats, for root, merge,
+    renaming, binary and deleting commits.
+    """
+    repo = git.Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "dev")
+        config.set_value("user", "email", "dev@example.com")
+    commit_files(repo, {"a.txt": b"a\n", "with space.txt": b"s\n"}, "root")
+    main = repo.active_branch
+    side = repo.create_head("side")
+    commit_files(repo, {"b.bin": b"\x00\x01\x02"}, "binary")
+    side.checkout()
+    commit_files(repo, {"c.txt": b"c\n"}, "side")
+    main.checkout()
+    repo.index.merge_tree(side, base=repo.merge_base(main, side)[0])
+    repo.index.commit("merge", parent_commits=(main.commit, side.commit), head=True)
+    repo.index.checkout(force=True)
+    repo.git.mv("a.txt", "renamed.txt")
+    repo.index.commit("rename")
+    commit_files(repo, {"with space.txt": None}, "delete")
+
+    repo = git.Repo(tmp_path, odbt=git.GitCmdObjectDB)
+    commits = list(repo.iter_commits())
+    modified = [
+        (record.hexsha, files)
+        for record, files in repository_manager.iter_commit_activity(repo)
+    ]
+
+    assert [sha for sha, _ in modified] == [commit.hexsha for commit in commits]
+    assert dict(modified) == {
+        commit.hexsha: list(commit.stats.files.keys()) for commit in commits
+    }
+
+
+def test_update_repo_fetches_new_commits(tmp_path):
+    """
+    A repository cloned before is moved to the commits pushed since, without a working tree.
+    """
+    origin = git.Repo.init(tmp_path / "origin")
+    with origin.config_writer() as config:
+        config.set_value("user", "name", "dev")
+        config.set_value("user", "email", "dev@example.com")
+    commit_files(origin, {"a.txt": b"a\n"}, "first")
+    clone = git.Repo.clone_from(
+        str(tmp_path / "origin"), tmp_path / "clone", no_checkout=True
+    )
+    latest = commit_files(origin, {"b.txt": b"b\n"}, "second")
+
+    repository_manager.update_repo(clone)
+
+    assert clone.head.commit == latest
+    assert [commit.message for commit in clone.iter_commits()] == ["second", "first"]
+    assert not (tmp_path / "clone" / "b.txt").exists()
+
+
+def index_contents(index):
+    return (
+        index.total_commits(),
+        index.committers_activity(),
+        sorted(index.commits_per_day(0, 10**6)),
+        sorted(index.file_touches(0, 10**6)),
+    )
+
+
+def test_activity_index_and_window_commits(tmp_path, monkeypatch):
+    """
+    The activity index spans the whole history and is extended incrementally to the same
+    contents as an index built at once, while the window walk stops at the day before the
+    window, keeping the commits committed after it.
+    """
+    monkeypatch.setattr(
+        repository_manager, "ACTIVITY_INDEX_DIR", str(tmp_path / "index")
+    )
+    repo = git.Repo.init(tmp_path / "repo")
+    dates = [
+        ("Dev@Example.com ", "2019-06-01T12:00:00+0000"),
+        ("other@example.com", "2021-03-01T12:00:00-0130"),
+        ("dev@example.com", "2022-01-10T12:00:00+0200"),
+    ]
+    for i, (email, date) in enumerate(dates):
+        with open(tmp_path / "repo" / "a.txt", "w") as f:
+            f.write(str(i))
+        repo.index.add(["a.txt"])
+        repo.index.commit(
+            str(i),
+            author=git.Actor("author", "Author@example.com"),
+            committer=git.Actor("dev", email),
+            commit_date=date,
+            author_date=date,
+        )
+        if i == 1:
+            repository_manager.update_activity_index(repo, "owner", "repo").close()
+
+    index = repository_manager.update_activity_index(repo, "owner", "repo")
+    incremental = index_contents(index)
+    index.clear()
+    index.close()
+    # rebuilt writing the counts of each commit separately
+    monkeypatch.setattr(activity_index, "FLUSH_COMMITS", 1)
+    index = repository_manager.update_activity_index(repo, "owner", "repo")
+    window = repository_manager.iter_window_commits(repo, datetime(2021, 1, 1))
+
+    assert incremental == index_contents(index)
+    assert index.head() == repo.head.commit.hexsha
+    assert index.total_commits() == repository_manager.count_commits(repo) == 3
+    assert index.committers_activity() == {
+        "dev@example.com": [1559390400, 1641816000],
+        "other@example.com": [1614600000, 1614600000],
+    }
+    assert index.file_touches(18687, 18688) == [
+        ("a.txt", "author@example.com", 18687, 1)
+    ]
+    index.close()
+    assert [
+        (
+            commit.hexsha,
+            commit.author,
+            commit.committer,
+            commit.authored_date,
+            commit.committed_date,
+            commit.author_tz_offset,
+            commit.committer_tz_offset,
+        )
+        for commit in window
+    ] == [
+        (
+            commit.hexsha,
+            "author@example.com",
+            commit.committer.email.lower().strip(),
+            commit.authored_date,
+            commit.committed_date,
+            commit.author_tz_offset,
+            commit.committer_tz_offset,
+        )
+        for commit in repo.iter_commits(max_count=2)
+    ]
+
+
+def test_activity_index_warns_about_treeless_clones(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        repository_manager, "ACTIVITY_INDEX_DIR", str(tmp_path / "index")
+    )
+    origin = git.Repo.init(tmp_path / "origin")
+    with origin.config_writer() as config:
+        config.set_value("user", "name", "dev")
+        config.set_value("user", "email", "dev@example.com")
+        config.set_value("uploadpack", "allowFilter", "true")
+    commit_files(origin, {"a.txt": b"a\n"}, "first")
+    messages = []
+    monkeypatch.setattr(repository_manager.console, "print", messages.append)
+
+    for mode, warned in (("blobless", False), ("treeless", True)):
+        clone = git.Repo.clone_from(
+            (tmp_path / "origin").as_uri(),
+            tmp_path / mode,
+            filter=repository_manager.CLONE_FILTERS[mode],
+            no_checkout=True,
+        )
+        assert repository_manager.clone_filter(clone) == (
+            repository_manager.CLONE_FILTERS[mode]
+        )
+        messages.clear()
+        repository_manager.update_activity_index(clone, "owner", mode).close()
+        assert any("Treeless clone" in message for message in messages) == warned
+    assert repository_manager.clone_filter(origin) is None
+
+
+def window_commits(commits):
+    community = Community("owner", "repo")
+    data = Data()
+    data.start_date = datetime(2023, 1, 1)
+    data.end_date = datetime(2023, 3, 31)
+    data.all_commits = commits
+    community.add_data(data)
+    filters.filter_commits(community)
+    return [commit.hexsha for commit in community.data.commits]
+
+
+def test_window_commits_behind_skewed_dates(tmp_path):
+    """
+    Commits committed before the window do not hide the window commits behind them, which are
+    selected as from the whole history.
+    """
+    repo = git.Repo.init(tmp_path)
+    dates = (
+        ["2023-01-1{}T12:00:00+0000".format(i) for i in range(3)]
+        + ["2022-06-0{}T12:00:00+0000".format(i) for i in range(1, 6)]
+        + ["2023-02-01T12:00:00+0000"]
+    )
+    for i, date in enumerate(dates):
+        with open(tmp_path / "a.txt", "w") as f:
+            f.write(str(i))
+        repo.index.add(["a.txt"])
+        repo.index.commit(
+            str(i),
+            author=git.Actor("dev", "dev@example.com"),
+            committer=git.Actor("dev", "dev@example.com"),
+            commit_date=date,
+            author_date=date,
+        )
+
+    window = window_commits(
+        repository_manager.iter_window_commits(repo, datetime(2023, 1, 1))
+    )
+
+    assert window == window_commits(
+        [record for record, _ in repository_manager.iter_commit_activity(repo)]
+    )
+    assert len(window) == 4
@@ -0,0 +1,78 @@
+import pytest
+from io_module import api_manager
+from io_module.telemetry import Telemetry, endpoint_template
+from io_module.tests.github_stub import GitHubStub
+
+
+@pytest.fixture(autouse=True)
+def fresh_session(fresh_session, monkeypatch):
+    monkeypatch.setattr(api_manager, "BACKOFF_FACTOR", 0)
+    monkeypatch.setattr(api_manager, "telemetry", Telemetry())
+
+
+@pytest.mark.parametrize(
+    "url, template",
+    [
+        (
+            "https://api.github.com/repos/octo/cat/pulls?state=all&page=3",
+            "GET /repos/{owner}/{repo}/pulls",
+        ),
+        (
+            "https://api.github.com/repos/octo/cat/pulls/42",
+            "GET /repos/{owner}/{repo}/pulls/{number}",
+        ),
+        (
+            "https://api.github.com/repos/octo/cat/commits/" + "a" * 40,
+            "GET /repos/{owner}/{repo}/commits/{sha}",
+        ),
+        ("https://api.github.com/users/octocat/followers", "GET /users/{login}/followers"),
+        (
+            "https://api.github.com/users/octocat/following/hubot",
+            "GET /users/{login}/following/{login}",
+        ),
+    ],
+)
+def test_endpoint_template(url, template):
+    assert endpoint_template("GET", url) == template
+
+
+def test_summary_percentiles():
+    telemetry = Telemetry()
+    for latency in range(1, 101):
+        telemetry.record("GET /users/{login}", latency / 100, size=10, status=200)
+    telemetry.record("GET /users/{login}", 2, status=None, retries=3)
+    summary = telemetry.summary()["GET /users/{login}"]
+    assert summary["requests"] == 101
+    assert summary["bytes"] == 1000
+    assert summary["retries"] == 3
+    assert summary["statuses"] == {"200": 100, "error": 1}
+    assert summary["latency"]["p50"] == 0.51
+    assert summary["latency"]["p99"] == 1.0
+    assert summary["latency"]["max"] == 2
+
+
+def test_requests_are_recorded():
+    """
+    Retries and cache revalidations of the requests sent through api_manager are recorded.
+    """
+    calls = []
+
+    def flaky(query, headers, body):
+        calls.append(1)
+        if len(calls) == 1:
+            return 502, {}, {"message": "Bad Gateway"}
+        if headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, None
+        return 200, {"ETag": '"v1"'}, {"login": "octocat"}
+
+    with GitHubStub() as stub:
+        stub.routes["/users/octocat"] = flaky
+        for _ in range(2):
+            assert api_manager.get_json(stub.url + "/users/octocat") == {
+                "login": "octocat"
+            }
+    summary = api_manager.telemetry.summary()["GET /users/{login}"]
+    assert summary["requests"] == 2
+    assert summary["retries"] == 1
+    assert summary["statuses"] == {"200": 1, "304": 1}
+    assert summary["cache"] == {"hit": 1, "miss": 1}
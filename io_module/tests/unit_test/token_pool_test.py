@@ -0,0 +1,79 @@
+import time
+from io_module import api_manager
+from io_module.rate_limiter import RateLimiter
+from io_module.token_pool import TokenPool
+from io_module.tests.github_stub import GitHubStub
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+
+
+def budget_headers(remaining, reset):
+    return {
+        "X-RateLimit-Limit": "5000",
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(reset),
+    }
+
+
+def test_from_environment(monkeypatch):
+    monkeypatch.setenv("PATS", "a, b,,c")
+    monkeypatch.setenv("PAT", "b")
+    assert TokenPool.from_environment(RateLimiter()).tokens == ["a", "b", "c"]
+
+
+def test_acquire_prefers_most_headroom():
+    limiter = RateLimiter()
+    pool = TokenPool(["a", "b", "c"], limiter)
+    reset = time.time() + 3600
+    limiter.update("a", FakeResponse(200, budget_headers(100, reset)))
+    limiter.update("b", FakeResponse(200, budget_headers(4000, reset)))
+    limiter.update("c", FakeResponse(200, budget_headers(2000, reset)))
+    assert pool.acquire() == "b"
+
+
+def test_acquire_skips_exhausted_tokens_until_reset():
+    limiter = RateLimiter()
+    pool = TokenPool(["a", "b"], limiter)
+    now = time.time()
+    limiter.update("a", FakeResponse(200, budget_headers(0, now + 3600)))
+    limiter.update("b", FakeResponse(200, budget_headers(1, now + 3600)))
+    assert pool.acquire() == "b"
+    limiter.update("b", FakeResponse(200, budget_headers(0, now + 60)))
+    # all exhausted: the token resetting first
+    assert pool.acquire() == "b"
+    limiter.update("a", FakeResponse(200, budget_headers(10, now - 1)))
+    assert pool.acquire() == "a"
+
+
+def test_budgets_are_kept_per_resource():
+    limiter = RateLimiter()
+    pool = TokenPool(["a", "b"], limiter)
+    limiter.update(
+        pool.budget("a", "graphql"), FakeResponse(200, budget_headers(0, time.time() + 60))
+    )
+    assert pool.acquire("graphql") == "b"
+    assert pool.acquire("core") == "a"
+
+
+def test_limited_request_is_sent_again_with_another_token(monkeypatch, fresh_session):
+    """
+    A token rejected by the rate limit is rotated out and the request succeeds with the next one.
+    """
+    limiter = RateLimiter()
+    monkeypatch.setattr(api_manager, "rate_limiter", limiter)
+    monkeypatch.setattr(api_manager, "_token_pool", TokenPool(["a", "b"], limiter))
+    reset = int(time.time()) + 3600
+
+    def user(query, headers, body):
+        if headers["Authorization"] == "Basic WU9TSEkzOmE=":  # YOSHI3:a
+            return 403, budget_headers(0, reset), {"message": "rate limited"}
+        return 200, budget_headers(4999, reset), {"login": "octocat"}
+
+    with GitHubStub() as stub:
+        stub.routes["/users/octocat"] = user
+        assert api_manager.get_json(stub.url + "/users/octocat") == {"login": "octocat"}
+        assert len(stub.requests) == 2
@@ -0,0 +1,78 @@
+import os
+import threading
+from io_module.rate_limiter import RateLimiter
+
+"""
+This module contains the pool of GitHub tokens used to authenticate the requests
+"""
+
+
+class TokenPool:
+    """
+    This class selects, for each request, the token with the most requests left in its budget.
+    Tokens that exhausted their budget, or hit a secondary rate limit, are skipped until they reset.
+    Budgets are kept separately for each API resource (e.g. "core" and "graphql").
+    """
+
+    def __init__(self, tokens: list, rate_limiter: RateLimiter):
+        """
+        :param tokens: the tokens of the pool
+        :param rate_limiter: the rate limiter tracking the budget of each token
+        """
+        self.tokens = []
+        self.rate_limiter = rate_limiter
+        self.lock = threading.Lock()
+        for token in tokens:
+            self.add_token(token)
+
+    @classmethod
+    def from_environment(cls, rate_limiter: RateLimiter):
+        """
+        This function builds the pool from the comma separated PATS variable and the PAT variable.
+
+        :param rate_limiter: the rate limiter tracking the budget of each token
+        :return: the token pool
+        """
+        tokens = [token.strip() for token in os.environ.get("PATS", "").split(",")]
+        tokens.append(os.environ.get("PAT", ""))
+        return cls([token for token in tokens if token], rate_limiter)
+
+    def add_token(self, token: str):
+        with self.lock:
+            if token and token not in self.tokens:
+                self.tokens.append(token)
+
+    @staticmethod
+    def budget(token: str, resource: str = "core"):
+        """
+        :return: the key identifying the budget of a token for an API resource
+        """
+        return token if resource == "core" else token + "#" + resource
+
+    def acquire(self, resource: str = "core"):
+        """
+        This function selects the token that will authenticate the next request.
+
+        :param resource: the API resource of the request
+        :return: the token with the most headroom, or the one resetting first if all are exhausted
+        (an empty string if the pool has no tokens)
+        """
+        with self.lock:
+            tokens = list(self.tokens)
+        if not tokens:
+            return ""
+        available = []
+        for token in tokens:
+            budget = self.budget(token, resource)
+            if self.rate_limiter.available_at(budget) == 0:
+                remaining = self.rate_limiter.remaining(budget)
+                # tokens never used so far have their whole budget left
+                available.append((float("inf") if remaining is None else remaining, token))
+        if available:
+            return max(available, key=lambda item: item[0])[1]
+        return min(
+            tokens,
+            key=lambda token: self.rate_limiter.available_at(
+                self.budget(token, resource)
+            ),
+        )
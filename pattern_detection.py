@@ -1,15 +1,17 @@
+import asyncio
 import requests
 import os
 import json
 from datetime import datetime, date, timedelta
 from auth import oauth2
 from compute_community_pattern import compute_community_patterns
-from io_module import input_handler, repository_manager, output_handler
+from io_module import input_handler, repository_manager, output_handler, api_manager
 from data_retriever.data_retriever import (
     retrieve_data_and_check_validity,
     retrieve_structure_data,
     retrieve_miscellaneous_data,
 )
+from data_retriever import async_data_retriever
 from console import console
 from community.data import Data
 from community.metrics import Metrics
@@ -21,14 +23,19 @@ from data_processor import (
     longevity_processor,
 )
 
+# retrieve structure and miscellaneous data with concurrent requests
+ASYNC_RETRIEVAL = os.environ.get("ASYNC_RETRIEVAL", "false").lower() == "true"
+
 
 def main():
     console.rule("Input information")
     input_path, output_path = input_handler.get_input_files()
     communities = input_handler.get_input_communities(input_path)
 
-    console.rule("GitHub Authentication")
-    pat = oauth2.get_access_token()
+    if api_manager.CASSETTE_MODE != "replay":
+        console.rule("GitHub Authentication")
+        pat = oauth2.get_access_token()
+        api_manager.get_token_pool().add_token(pat)
 
     for community in communities:
         """
@@ -39,63 +46,116 @@ def main():
             "Community " + community.repo_name + " from " + community.repo_owner
         )
 
-        repo = repository_manager.download_repo(
-            community.repo_owner, community.repo_name
-        )
+        try:
+            api_manager.start_cassette(community.repo_owner, community.repo_name)
+            repo = repository_manager.download_repo(
+                community.repo_owner,
+                community.repo_name,
+                since=community.data.start_date
+                if repository_manager.CLONE_SHALLOW
+                else None,
+                update=api_manager.CASSETTE_MODE != "replay",
+            )
 
-        community.data.all_commits = list(repo.iter_commits())
+            community.data.total_commits = repository_manager.count_commits(repo)
+            community.data.all_commits = repository_manager.iter_window_commits(
+                repo, community.data.start_date
+            )
 
-        if not retrieve_data_and_check_validity(community):
-            console.print("[bold red]Invalid repository")
-        else:
-            console.print("[bold green]Repository is valid")
+            api_manager.rate_limiter.reset_usage()
+            api_manager.telemetry.reset()
+            if api_manager.get_http_cache() is not None:
+                api_manager.get_http_cache().reset_stats()
+            with api_manager.rate_limiter.stage("validation"):
+                valid = retrieve_data_and_check_validity(community)
+            if not valid:
+                console.print("[bold red]Invalid repository")
+            else:
+                console.print("[bold green]Repository is valid")
 
-            console.log("Retrieving data to compute community structure")
-            retrieve_structure_data(community)
-            console.log("[bold yellow] Computing COMMUNITY STRUCTURE")
-            structure = structure_processor.compute_structure_data(community)
-            if structure:
-                console.log(
-                    "Retrieving data to compute community geodispersion, formality, engagement and longevity"
+                # the whole history is indexed only for the repositories that are valid
+                activity_index = repository_manager.update_activity_index(
+                    repo, community.repo_owner, community.repo_name
                 )
-                retrieve_miscellaneous_data(community)
-                console.log("[bold yellow] Computing COMMUNITY GEODISPERSION")
-                dispersion_processor.compute_distances(community)
-                console.log("[bold yellow] Computing COMMUNITY FORMALITY")
-                formality_processor.compute_formality_data(community)
-                console.log("[bold yellow] Computing COMMUNITY ENGAGEMENT")
-                engagement_success = engagement_processor.compute_engagement_data(
-                    community
+                community.data.committers_activity = (
+                    activity_index.committers_activity()
                 )
-                if engagement_success:
-                    console.log("[bold yellow] Computing COMMUNITY LONGEVITY")
-                    longevity_processor.compute_longevity_data(community)
+                activity_index.close()
 
-                    console.print(community.metrics)
-                    console.log("[bold purple] Computing COMMUNITY PATTERNS")
-                    (
-                        structure,
-                        dispersion,
-                        formality,
-                        longevity,
-                        engagement,
-                        community_patterns,
-                    ) = compute_community_patterns(community.metrics)
-                    console.print(
-                        {
-                            "structure ": structure,
-                            "dispersion ": dispersion,
-                            "formality ": formality,
-                            "longevity ": longevity,
-                            "engagement ": engagement,
-                        }
+                console.log("Retrieving data to compute community structure")
+                with api_manager.rate_limiter.stage("structure"):
+                    if ASYNC_RETRIEVAL:
+                        asyncio.run(
+                            async_data_retriever.retrieve_structure_data(community)
+                        )
+                    else:
+                        retrieve_structure_data(community)
+                console.log("[bold yellow] Computing COMMUNITY STRUCTURE")
+                structure = structure_processor.compute_structure_data(community)
+                if structure:
+                    console.log(
+                        "Retrieving data to compute community geodispersion, formality, engagement and longevity"
                     )
-                    console.print(community_patterns)
-                    console.print(community.data.start_date, community.data.end_date)
-                    patterns = community_patterns
-                    output_handler.save_results(
-                        output_path, community, community_patterns
+                    with api_manager.rate_limiter.stage("miscellaneous"):
+                        if ASYNC_RETRIEVAL:
+                            asyncio.run(
+                                async_data_retriever.retrieve_miscellaneous_data(
+                                    community
+                                )
+                            )
+                        else:
+                            retrieve_miscellaneous_data(community)
+                    console.log("[bold yellow] Computing COMMUNITY GEODISPERSION")
+                    dispersion_processor.compute_distances(community)
+                    console.log("[bold yellow] Computing COMMUNITY FORMALITY")
+                    formality_processor.compute_formality_data(community)
+                    console.log("[bold yellow] Computing COMMUNITY ENGAGEMENT")
+                    engagement_success = engagement_processor.compute_engagement_data(
+                        community
                     )
+                    if engagement_success:
+                        console.log("[bold yellow] Computing COMMUNITY LONGEVITY")
+                        longevity_processor.compute_longevity_data(community)
+
+                        console.print(community.metrics)
+                        console.log("[bold purple] Computing COMMUNITY PATTERNS")
+                        (
+                            structure,
+                            dispersion,
+                            formality,
+                            longevity,
+                            engagement,
+                            community_patterns,
+                        ) = compute_community_patterns(community.metrics)
+                        console.print(
+                            {
+                                "structure ": structure,
+                                "dispersion ": dispersion,
+                                "formality ": formality,
+                                "longevity ": longevity,
+                                "engagement ": engagement,
+                            }
+                        )
+                        console.print(community_patterns)
+                        console.print(community.data.start_date, community.data.end_date)
+                        patterns = community_patterns
+                        output_handler.save_results(
+                            output_path, community, community_patterns
+                        )
+        except api_manager.GitHubAPIError as e:
+            console.print("[bold red]There was an error with GitHub API: " + str(e))
+            console.print("[bold red]Skipping community " + community.repo_name)
+        finally:
+            api_manager.stop_cassette()
+        console.print("GitHub API requests per stage:")
+        console.print(api_manager.rate_limiter.report())
+        if api_manager.get_http_cache() is not None:
+            console.print("GitHub API cache:")
+            console.print(api_manager.get_http_cache().stats())
+        telemetry = api_manager.telemetry.summary()
+        console.print("HTTP requests per endpoint:")
+        console.print(telemetry)
+        output_handler.save_telemetry(community, telemetry)
         """
             community.data.start_date = community.data.start_date + timedelta(days=30)
             community.data.end_date = community.data.end_date + timedelta(days=30)
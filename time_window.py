@@ -0,0 +1,100 @@
+import calendar
+import datetime
+from bisect import bisect_right
+
+"""
+This module checks commit epochs against the time window of an analysis.
+The bounds of the window are converted to epochs once, so that each check is a comparison
+between integers. Dates are compared by UTC day, as utils.check_date_within_timewindow does.
+"""
+
+DAY = 86400
+EPOCH = datetime.datetime(1970, 1, 1)
+# length of the months into which the window is split
+MONTH_DAYS = 30
+MONTHS = 3
+
+
+def to_epoch(date: datetime.datetime):
+    """
+    :param date: a naive date, in UTC
+    :return: the epoch of the date
+    """
+    return calendar.timegm(date.timetuple())
+
+
+def day(epoch: int):
+    """
+    :return: the number of the UTC day of an epoch
+    """
+    return epoch // DAY
+
+
+def to_datetime(number: int):
+    """
+    :param number: the number of a UTC day
+    :return: the midnight of the day, as the dates built from utils.convert_date
+    """
+    return EPOCH + datetime.timedelta(days=number)
+
+
+def first_day_from(date: datetime.datetime):
+    """
+    :return: the number of the first UTC day whose midnight is not before the date
+    """
+    return -(-to_epoch(date) // DAY)
+
+
+def first_day_after(date: datetime.datetime):
+    """
+    :return: the number of the first UTC day whose midnight is after the date
+    """
+    return to_epoch(date) // DAY + 1
+
+
+class TimeWindow:
+    """
+    This class stores the bounds of a time window as epochs: a commit epoch is within the window
+    if start <= epoch < end.
+    """
+
+    def __init__(self, start_date: datetime.datetime, end_date: datetime.datetime):
+        """
+        :param start_date: the start of the window
+        :param end_date: the end of the window, whose day is included
+        """
+        self.start = first_day_from(start_date) * DAY
+        self.end = first_day_after(end_date) * DAY
+        # the last 30 days of the window, in which members are considered active
+        self.recent_start = (
+            first_day_from(end_date - datetime.timedelta(days=MONTH_DAYS)) * DAY
+        )
+        # the days of a month are after its start and before the end of the window
+        self.month_starts = [
+            first_day_after(start_date + datetime.timedelta(days=MONTH_DAYS * month))
+            * DAY
+            for month in range(MONTHS)
+        ]
+        self.months_end = first_day_from(end_date) * DAY
+
+    @classmethod
+    def of(cls, community):
+        """
+        :return: the time window of the analysis of a community
+        """
+        return cls(community.data.start_date, community.data.end_date)
+
+    def contains(self, epoch: int):
+        return self.start <= epoch < self.end
+
+    def is_recent(self, epoch: int):
+        return self.recent_start <= epoch < self.end
+
+    def month(self, epoch: int):
+        """
+        :return: the month of the window (0, 1 or 2) of an epoch, None if out of the window
+        """
+        if epoch >= self.months_end:
+            return None
+        month = bisect_right(self.month_starts, epoch) - 1
+        return month if month >= 0 else None